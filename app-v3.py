@@ -1,115 +1,25 @@
+import time
+
 import streamlit as st
-import random
-import numpy as np
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
 
-st.set_page_config(page_title="Simulateur avancé d'inertie structurelle", layout="wide")
+from inertie import cache, charts, grid, metrics, session, store
+from inertie import events as ev
+from inertie.agent import DecisionAgent
+from inertie.batch import OUTCOMES
+from inertie.fan import fan_quantiles
+from inertie.rng import new_seed
+
+run_start = time.perf_counter()
 
-class DecisionAgent:
-    def __init__(self, procrastination, pessimism, loss_aversion, scarcity, avoidance, pressure, invisibilisation, visibilite_coulisses):
-        self.procrastination = procrastination
-        self.pessimism = pessimism
-        self.loss_aversion = loss_aversion
-        self.scarcity = scarcity
-        self.avoidance = avoidance
-        self.pressure = pressure
-        self.invisibilisation = invisibilisation
-        self.visibilite_coulisses = visibilite_coulisses
-
-    def simulate(self):
-        outcome = "indécision"
-        decision_progress = 0
-        time_elapsed = 0
-        steps = []
-        progress_history = []
-
-        while outcome == "indécision" and time_elapsed < 12:
-            time_elapsed += 1
-            base_step = f"Mois {time_elapsed} : "
-
-            # Pessimisme bloque la projection
-            if random.random() < self.pessimism / 15:
-                steps.append(base_step + "vision négative → inertie.")
-                progress_history.append(decision_progress)
-                continue
-
-            # Procrastination : report
-            if random.random() < self.procrastination / 12:
-                steps.append(base_step + "report de la décision.")
-                progress_history.append(decision_progress)
-                continue
-
-            # Scarcity mindset : réduction du champ décisionnel
-            if random.random() < self.scarcity / 12:
-                steps.append(base_step + "réduction des options → statu quo.")
-                progress_history.append(decision_progress)
-                continue
-
-            # Invisibilisation : actions ignorées ou sabotées
-            if random.random() < self.invisibilisation / 15:
-                decision_progress -= 1
-                steps.append(base_step + "action invisible → sentiment d’inutilité.")
-                progress_history.append(decision_progress)
-                continue
-
-            # Auto-effacement si invisibilisation forte
-            if self.invisibilisation > 8 and random.random() < 0.5:
-                steps.append(base_step + "auto-effacement → renoncement silencieux.")
-                progress_history.append(decision_progress)
-                continue
-
-            # Pression extérieure déclenche parfois l’action
-            if random.random() < self.pressure / 10:
-                decision_progress += 3
-                steps.append(base_step + "pression extérieure → tentative d’action.")
-            else:
-                decision_progress += 1
-                steps.append(base_step + "réflexion / micro-action.")
-
-            # Aversion à la perte → doute après action
-            if random.random() < self.loss_aversion / 15:
-                decision_progress -= 1
-                steps[-1] += " → doute post-action."
-
-            progress_history.append(decision_progress)
-
-            # Check résultat
-            if decision_progress >= 8:
-                outcome = "succès"
-            elif decision_progress <= -5:
-                outcome = "échec"
-
-        if time_elapsed >= 12 and outcome == "indécision":
-            outcome = "report indéfini"
-
-        return steps, outcome, progress_history
-
-    def calculate_inertia_score(self):
-        # Score cognitif
-        score_cognitif = (self.procrastination + self.pessimism + self.loss_aversion + self.avoidance) * 2.5
-        # Score conjoncturel (pressure inverse)
-        score_conjoncturel = (self.scarcity + (10 - self.pressure)) * 5
-        # Score structurel
-        score_structurel = self.invisibilisation * 10
-
-        # Effet amplificateur de la visibilité : moins on voit, plus l'inertie structurelle augmente
-        # On définit un facteur multiplicateur de 1 (transparence totale) à 1.5 (opaque)
-        amplificateur_visibilite = 1 + (10 - self.visibilite_coulisses) * 0.05
-
-        # Application du multiplicateur sur la somme des scores
-        total_brut = score_cognitif + score_conjoncturel + score_structurel
-        total = total_brut * amplificateur_visibilite
-
-        return {
-            "cognitif": score_cognitif,
-            "conjoncturel": score_conjoncturel,
-            "structurel": score_structurel,
-            "total_brut": total_brut,
-            "total": total,
-            "amplificateur_visibilite": amplificateur_visibilite
-        }
+# Registre persistant des simulations : le cache de résultats est servi depuis le disque
+if store.DEFAULT_PATH:
+    cache.attach_store(store.open_store())
+
+st.set_page_config(page_title="Simulateur avancé d'inertie structurelle", layout="wide")
 
+N_BATCH = 100_000
+# Graine fixe des statistiques batch : le résultat ne dépend que du profil et se partage via le cache
+BATCH_SEED = 0
 
 st.title("🧠 Simulateur avancé d'inertie structurelle avec visibilité interne")
 
@@ -127,6 +37,10 @@ with st.sidebar:
     pressure = st.slider("🔥 Pression extérieure", 0, 10, 5)
     invisibilisation = st.slider("👻 Invisibilisation structurelle", 0, 10, 5)
     visibilite_coulisses = st.slider("🔍 Visibilité sur les coulisses (transparence interne)", 0, 10, 5)
+    seed_input = st.number_input("🌱 Graine (vide = aléatoire)", min_value=0, value=None, step=1)
+    # Graphiques plotly : rendus par le navigateur, aucune rastérisation côté serveur
+    client_charts = st.checkbox("🖥️ Graphiques interactifs (rendu navigateur)", value=False)
+    debug_panel = st.checkbox("🩺 Mode diagnostic", value=False)
 
     if st.button("🎲 Lancer la simulation"):
         agent = DecisionAgent(
@@ -139,19 +53,40 @@ with st.sidebar:
             invisibilisation,
             visibilite_coulisses
         )
-        story, outcome, progress_history = agent.simulate()
-        inertia_scores = agent.calculate_inertia_score()
+        params = agent.parameters()
+        seed = int(seed_input) if seed_input is not None else new_seed()
+        # La session ne garde que le descripteur du lancement ; les résultats sont épinglés à part
+        st.session_state["run"] = (params, seed)
+
+
+def run_result(name):
+    # Résultat du dernier lancement : épinglé pour la session, sinon relu (cache partagé, registre)
+    # ou recalculé à partir du profil et de la graine
+    params, seed = st.session_state["run"]
+    agent = DecisionAgent(*params)
+    recipes = {
+        "trajectory": lambda: cache.cached(
+            "trajectory", params, lambda: agent.simulate(rng=seed), seed=seed, stochastic=True
+        ),
+        "inertia_scores": lambda: cache.cached("inertia", params, agent.calculate_inertia_score),
+        "batch_counts": lambda: cache.cached("batch", params, lambda: agent.simulate_batch(
+            N_BATCH, rng=BATCH_SEED, keep_progress=False
+        )["counts"], seed=BATCH_SEED, stochastic=True, args=(N_BATCH,)),
+        "exact_probabilities": lambda: cache.cached("exact", params, lambda: grid.outcome_probabilities(params)),
+        "fan_quantiles": lambda: cache.cached("fan", params, lambda: fan_quantiles(params, N_BATCH, rng=BATCH_SEED),
+                                              seed=BATCH_SEED, stochastic=True, args=(N_BATCH,)),
+    }
+    return session.SESSIONS.result(st.session_state, (name, params, seed), recipes[name])
 
-        st.session_state["story"] = story
-        st.session_state["outcome"] = outcome
-        st.session_state["progress_history"] = progress_history
-        st.session_state["inertia_scores"] = inertia_scores
-        st.session_state["visibilite_coulisses"] = visibilite_coulisses
 
-if "story" in st.session_state:
+if "run" in st.session_state:
+    params, seed = st.session_state["run"]
+    events, outcome, progress = run_result("trajectory")
     st.subheader("📜 Scénario simulé mois par mois")
-    for line in st.session_state["story"]:
-        st.markdown(f"- {line}")
+    # Récit reconstruit à l'affichage à partir des codes
+    with metrics.timer("story"):
+        for line in ev.render_story(events):
+            st.markdown(f"- {line}")
 
     st.subheader("🎯 Résultat final")
     emoji = {
@@ -160,10 +95,21 @@ if "story" in st.session_state:
         "report indéfini": "⏸️",
         "indécision": "🤷‍♂️"
     }
-    st.markdown(f"### {emoji.get(st.session_state['outcome'], '')} **{st.session_state['outcome'].upper()}**")
+    st.markdown(f"### {emoji.get(outcome, '')} **{outcome.upper()}**")
+    st.caption(f"🌱 Graine de la trajectoire : {seed} (à saisir dans la barre latérale pour la rejouer)")
+
+    # Fréquences observées sur un grand nombre de trajectoires du même profil
+    counts = run_result("batch_counts")
+    st.markdown(f"Sur {N_BATCH} trajectoires : " + " · ".join(
+        f"{emoji[name]} {name} **{counts[name] / N_BATCH:.1%}**" for name in OUTCOMES
+    ))
+    exact = run_result("exact_probabilities")
+    st.markdown("Probabilités exactes : " + " · ".join(
+        f"{emoji[name]} {name} **{exact[name]:.2%}**" for name in OUTCOMES
+    ))
 
     st.subheader("🧭 Score d'inertie structurelle")
-    s = st.session_state["inertia_scores"]
+    s = run_result("inertia_scores")
     ampl = s["amplificateur_visibilite"]
     st.markdown(f"""
     - Cognitif : **{s['cognitif']:.1f} / 100**  
@@ -188,35 +134,36 @@ if "story" in st.session_state:
 
     # Diagramme radar
     st.subheader("📈 Triangulation de l'inertie (psychique, matériel, structurel)")
-    labels = ['Cognitif', 'Conjoncturel', 'Structurel']
     values = [s['cognitif'], s['conjoncturel'], s['structurel']]
-    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-    values += values[:1]
-    angles += angles[:1]
-
-    fig, ax = plt.subplots(figsize=(6,6), subplot_kw=dict(polar=True))
-    ax.fill(angles, values, color='skyblue', alpha=0.7)
-    ax.plot(angles, values, color='blue', linewidth=2)
-    ax.set_yticklabels([])
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(labels)
-    ax.set_title("Radar de l'inertie structurelle", fontsize=14, pad=20)
-    st.pyplot(fig)
+    if client_charts:
+        st.plotly_chart(charts.radar_plotly(values))
+    else:
+        st.image(charts.radar_png(values))
 
     # Frise chronologique de la progression décisionnelle
     st.subheader("📅 Frise chronologique de la progression décisionnelle")
+    if client_charts:
+        st.plotly_chart(charts.timeline_plotly(progress))
+    else:
+        st.image(charts.timeline_png(progress))
 
-    progress = st.session_state["progress_history"]
-    months = list(range(1, len(progress)+1))
-
-    fig2, ax2 = plt.subplots(figsize=(10,3))
-    ax2.plot(months, progress, marker='o', color='tab:green')
-    ax2.axhline(y=8, color='tab:blue', linestyle='--', label="Seuil succès")
-    ax2.axhline(y=-5, color='tab:red', linestyle='--', label="Seuil échec")
-    ax2.set_xlabel("Mois")
-    ax2.set_ylabel("Progression décisionnelle")
-    ax2.set_xticks(months)
-    ax2.set_ylim(min(progress)-1, max(progress)+1)
-    ax2.legend()
-    ax2.grid(True)
-    st.pyplot(fig2)
+    # Éventail : quantiles mensuels de la progression sur les trajectoires batch, trajectoire simulée en surimpression
+    st.subheader(f"🌬️ Éventail de la progression sur {N_BATCH:,} trajectoires")
+    fan = run_result("fan_quantiles")
+    if client_charts:
+        st.plotly_chart(charts.fan_plotly(fan, progress))
+    else:
+        st.image(charts.fan_png(fan, progress))
+
+# Panneau de diagnostic : durées par étape, caches et taille de l'état, agrégés sur le processus
+metrics.end_run(run_start, st.session_state)
+if debug_panel:
+    with st.sidebar.expander("🩺 Métriques", expanded=True):
+        snapshot = metrics.REGISTRY.snapshot()
+        st.table({
+            name: {"appels": t["count"], "moyenne (ms)": round(t["mean"] * 1000, 2), "max (ms)": round(t["max"] * 1000, 2)}
+            for name, t in snapshot["timers"].items()
+        })
+        st.json({"caches": snapshot["caches"], "jauges": snapshot["gauges"], "compteurs": snapshot["counters"]})
+        st.download_button("⬇️ JSON", metrics.REGISTRY.to_json(), file_name="metrics.json", mime="application/json")
+        st.download_button("⬇️ Prometheus", metrics.REGISTRY.to_prometheus(), file_name="metrics.prom", mime="text/plain")
@@ -1,114 +1,31 @@
+import time
+
 import streamlit as st
-import random
-import numpy as np
-import matplotlib.pyplot as plt
 
-st.set_page_config(page_title="Simulateur avancé d'inertie structurelle", layout="wide")
+from inertie import cache, charts, grid, incremental, metrics, optimizer, session, store
+from inertie import events as ev
+from inertie.agent import PARAM_LABELS, DecisionAgent, get_posture_and_advice
+from inertie.batch import OUTCOMES, PARAM_NAMES
+from inertie.fan import fan_quantiles
+from inertie.progressive import progressive_monte_carlo
+from inertie.rng import new_seed
+from inertie.scenarios import compare_scenarios
 
-class DecisionAgent:
-    def __init__(self, procrastination, pessimism, loss_aversion, scarcity, avoidance, pressure, invisibilisation, visibilite_coulisses):
-        self.procrastination = procrastination
-        self.pessimism = pessimism
-        self.loss_aversion = loss_aversion
-        self.scarcity = scarcity
-        self.avoidance = avoidance
-        self.pressure = pressure
-        self.invisibilisation = invisibilisation
-        self.visibilite_coulisses = visibilite_coulisses
-
-    def simulate(self):
-        outcome = "indécision"
-        decision_progress = 0
-        time_elapsed = 0
-        steps = []
-        progress_history = []
-
-        while outcome == "indécision" and time_elapsed < 12:
-            time_elapsed += 1
-            base_step = f"Mois {time_elapsed} : "
-
-            if random.random() < self.pessimism / 15:
-                steps.append(base_step + "vision négative → inertie.")
-                progress_history.append(decision_progress)
-                continue
-
-            if random.random() < self.procrastination / 12:
-                steps.append(base_step + "report de la décision.")
-                progress_history.append(decision_progress)
-                continue
-
-            if random.random() < self.scarcity / 12:
-                steps.append(base_step + "réduction des options → statu quo.")
-                progress_history.append(decision_progress)
-                continue
-
-            if random.random() < self.invisibilisation / 15:
-                decision_progress -= 1
-                steps.append(base_step + "action invisible → sentiment d’inutilité.")
-                progress_history.append(decision_progress)
-                continue
-
-            if self.invisibilisation > 8 and random.random() < 0.5:
-                steps.append(base_step + "auto-effacement → renoncement silencieux.")
-                progress_history.append(decision_progress)
-                continue
-
-            if random.random() < self.pressure / 10:
-                decision_progress += 3
-                steps.append(base_step + "pression extérieure → tentative d’action.")
-            else:
-                decision_progress += 1
-                steps.append(base_step + "réflexion / micro-action.")
-
-            if random.random() < self.loss_aversion / 15:
-                decision_progress -= 1
-                steps[-1] += " → doute post-action."
-
-            progress_history.append(decision_progress)
-
-            if decision_progress >= 8:
-                outcome = "succès"
-            elif decision_progress <= -5:
-                outcome = "échec"
-
-        if time_elapsed >= 12 and outcome == "indécision":
-            outcome = "report indéfini"
-
-        return steps, outcome, progress_history
-
-    def calculate_inertia_score(self):
-        score_cognitif = (self.procrastination + self.pessimism + self.loss_aversion + self.avoidance) * 2.5
-        score_conjoncturel = (self.scarcity + (10 - self.pressure)) * 5
-        score_structurel = self.invisibilisation * 10
-        amplificateur_visibilite = 1 + (10 - self.visibilite_coulisses) * 0.05
-        total_brut = score_cognitif + score_conjoncturel + score_structurel
-        total = total_brut * amplificateur_visibilite
-        return {
-            "cognitif": score_cognitif,
-            "conjoncturel": score_conjoncturel,
-            "structurel": score_structurel,
-            "total_brut": total_brut,
-            "total": total,
-            "amplificateur_visibilite": amplificateur_visibilite
-        }
+run_start = time.perf_counter()
 
-def get_posture_and_advice(score):
-    if score < 120:
-        posture = "Tu as un bon potentiel d'action. Reste vigilant et mobilise tes ressources."
-        advice = "Profite de cette dynamique pour avancer par petits pas, chercher du soutien et célébrer tes succès."
-    elif score < 180:
-        posture = "L’inertie est présente mais surmontable avec de la persévérance."
-        advice = ("Prépare-toi à batailler, mais garde l'espoir. "
-                  "Concentre-toi sur ce que tu peux contrôler et avance un pas à la fois.")
-    elif score < 240:
-        posture = "Les blocages sont sérieux, il faudra de la ténacité et une stratégie claire."
-        advice = ("Identifie clairement les moments où tu peux agir, "
-                  "et apprends à protéger ton énergie. Cultive ta résilience.")
-    else:
-        posture = "Le système pèse lourdement, mais tu incarnes la force qui peut résister."
-        advice = ("Sois patient·e, essaie de trouver des alliés, "
-                  "et garde la foi en ta capacité à faire bouger les lignes, même à petits pas.")
-    return posture, advice
+# Registre persistant des simulations : le cache de résultats est servi depuis le disque
+if store.DEFAULT_PATH:
+    cache.attach_store(store.open_store())
+
+st.set_page_config(page_title="Simulateur avancé d'inertie structurelle", layout="wide")
+
+N_BATCH = 100_000
+# Graine fixe des statistiques batch : le résultat ne dépend que du profil et se partage via le cache
+BATCH_SEED = 0
+# Probabilité de succès visée par le plan d'intervention minimale
+TARGET_SUCCESS = 0.5
+# Profils évalués au plus pour trouver ce plan (de l'ordre de 200 ms sans table précalculée), sinon pas de plan
+PLAN_EVALUATIONS = 10_000
 
 st.title("🧠 Simulateur avancé d'inertie structurelle avec posture actionable")
 
@@ -117,8 +34,10 @@ Ce simulateur modélise l’impact combiné de biais cognitifs, contextuels, inv
 Il propose aussi une **posture concrète** pour avancer, au-delà des blocages.
 """)
 
-with st.sidebar:
-    st.header("🔧 Paramètres du profil")
+@st.fragment
+def controls():
+    # Curseurs dans un fragment : les déplacer ne relance que la barre latérale, pas tout le script ;
+    # les boutons enregistrent le descripteur du lancement puis relancent l'application
     procrastination = st.slider("⏳ Procrastination", 0, 10, 5)
     pessimism = st.slider("🌧️ Vision pessimiste", 0, 10, 5)
     loss_aversion = st.slider("⚖️ Aversion à la perte", 0, 10, 5)
@@ -127,6 +46,7 @@ with st.sidebar:
     pressure = st.slider("🔥 Pression extérieure", 0, 10, 5)
     invisibilisation = st.slider("👻 Invisibilisation structurelle", 0, 10, 5)
     visibilite_coulisses = st.slider("🔍 Visibilité sur les coulisses (transparence interne)", 0, 10, 5)
+    seed_input = st.number_input("🌱 Graine (vide = aléatoire)", min_value=0, value=None, step=1)
 
     if st.button("🎲 Lancer la simulation"):
         agent = DecisionAgent(
@@ -139,18 +59,148 @@ with st.sidebar:
             invisibilisation,
             visibilite_coulisses
         )
-        story, outcome, progress_history = agent.simulate()
-        inertia_scores = agent.calculate_inertia_score()
-        st.session_state["story"] = story
-        st.session_state["outcome"] = outcome
-        st.session_state["progress_history"] = progress_history
-        st.session_state["inertia_scores"] = inertia_scores
-        st.session_state["visibilite_coulisses"] = visibilite_coulisses
-
-if "story" in st.session_state:
+        seed = int(seed_input) if seed_input is not None else new_seed()
+        # La session ne garde que le descripteur du lancement ; les résultats sont épinglés à part
+        st.session_state["run"] = (agent.parameters(), seed)
+        st.rerun()
+
+    # Mode distribution : paquets de trajectoires jusqu'à la précision choisie
+    target_width = st.select_slider("🎯 Précision visée (largeur des intervalles à 95 %)",
+                                    options=[0.05, 0.02, 0.01, 0.005, 0.002], value=0.01)
+    if st.button("📊 Distribution des issues"):
+        profile = (procrastination, pessimism, loss_aversion, scarcity, avoidance, pressure,
+                   invisibilisation, visibilite_coulisses)
+        st.session_state["distribution"] = (profile, target_width)
+        st.rerun()
+
+
+with st.sidebar:
+    st.header("🔧 Paramètres du profil")
+    controls()
+    # Graphiques plotly : rendus par le navigateur, aucune rastérisation côté serveur
+    client_charts = st.checkbox("🖥️ Graphiques interactifs (rendu navigateur)", value=False)
+    debug_panel = st.checkbox("🩺 Mode diagnostic", value=False)
+
+
+# Artefacts dérivés du lancement : chacun déclare ses entrées et n'est recalculé que si elles changent
+pipeline = incremental.Pipeline()
+
+
+@pipeline.node("trajectory", "profile", "seed")
+def node_trajectory(params, seed):
+    return cache.cached("trajectory", params, lambda: DecisionAgent(*params).simulate(rng=seed),
+                        seed=seed, stochastic=True)
+
+
+@pipeline.node("narrative", "trajectory")
+def node_narrative(trajectory):
+    # Récit reconstruit à partir des codes, en un seul bloc markdown
+    with metrics.timer("story"):
+        return "\n".join(f"- {line}" for line in ev.render_story(trajectory[0]))
+
+
+@pipeline.node("inertia_scores", "profile")
+def node_inertia_scores(params):
+    return cache.cached("inertia", params, DecisionAgent(*params).calculate_inertia_score)
+
+
+@pipeline.node("batch_counts", "profile")
+def node_batch_counts(params):
+    return cache.cached("batch", params, lambda: DecisionAgent(*params).simulate_batch(
+        N_BATCH, rng=BATCH_SEED, keep_progress=False
+    )["counts"], seed=BATCH_SEED, stochastic=True, args=(N_BATCH,))
+
+
+@pipeline.node("exact_probabilities", "profile")
+def node_exact_probabilities(params):
+    return cache.cached("exact", params, lambda: grid.outcome_probabilities(params))
+
+
+@pipeline.node("neighbours", "profile")
+def node_neighbours(params):
+    # Effet d'un cran sur chaque curseur, lu dans la table précalculée
+    moves, rows = grid.neighbours(params)
+    return list(zip(moves, grid.outcome_probabilities(rows)["succès"].tolist()))
+
+
+@pipeline.node("fan_quantiles", "profile")
+def node_fan(params):
+    return cache.cached("fan", params, lambda: fan_quantiles(params, N_BATCH, rng=BATCH_SEED),
+                        seed=BATCH_SEED, stochastic=True, args=(N_BATCH,))
+
+
+@pipeline.node("levers", "profile")
+def node_levers(params):
+    # Sans levier qui change sensiblement P(succès) (profil déjà sûr ou bloqué), leviers sur le score
+    return cache.cached("levers", params, lambda: optimizer.ranked_levers(params)[:3]
+                        or optimizer.ranked_levers(params, objective="score")[:3], args=(3,))
+
+
+@pipeline.node("plan", "profile")
+def node_plan(params):
+    return cache.cached("plan", params,
+                        lambda: optimizer.minimal_intervention(params, target_success=TARGET_SUCCESS,
+                                                               max_evaluations=PLAN_EVALUATIONS),
+                        args=(TARGET_SUCCESS, PLAN_EVALUATIONS))
+
+
+@pipeline.node("scenarios", "profile", "levers", "plan")
+def node_scenarios(params, levers, plan):
+    # Profil actuel, plan d'intervention minimale, puis chacun des meilleurs leviers seul
+    labels, profiles = ["Profil actuel"], [tuple(params)]
+    if plan and plan["changes"]:
+        labels.append("Plan minimal")
+        profiles.append(tuple(plan["params"]))
+    for lever in levers:
+        profile = list(params)
+        profile[PARAM_NAMES.index(lever["param"])] = lever["to"]
+        labels.append(f"{PARAM_LABELS[lever['param']]} {lever['from']} → {lever['to']}")
+        profiles.append(tuple(profile))
+    return labels, profiles
+
+
+@pipeline.node("comparison", "scenarios")
+def node_comparison(scenarios):
+    # Tous les scénarios en un seul calcul exact vectorisé
+    return compare_scenarios(scenarios[1])
+
+
+@pipeline.node("comparison_chart", "comparison", "scenarios")
+def node_comparison_chart(comparison, scenarios):
+    return charts.scenarios_png(comparison["fan"], scenarios[0])
+
+
+@pipeline.node("posture", "inertia_scores", "levers")
+def node_posture(scores, levers):
+    posture, advice = get_posture_and_advice(scores["total"], levers=levers)
+    return posture, advice.replace('. ', '.  \n- ')
+
+
+@pipeline.node("radar", "inertia_scores")
+def node_radar(scores):
+    return charts.radar_png([scores['cognitif'], scores['conjoncturel'], scores['structurel']])
+
+
+@pipeline.node("timeline", "trajectory")
+def node_timeline(trajectory):
+    return charts.timeline_png(trajectory[2])
+
+
+@pipeline.node("fan_chart", "fan_quantiles", "trajectory")
+def node_fan_chart(fan, trajectory):
+    return charts.fan_png(fan, trajectory[2])
+
+
+if "run" in st.session_state:
+    params, seed = st.session_state["run"]
+    sources = {"profile": params, "seed": seed}
+
+    def artifact(name):
+        return pipeline.evaluate(st.session_state, name, sources)
+
+    events, outcome, progress = artifact("trajectory")
     st.subheader("📜 Scénario simulé mois par mois")
-    for line in st.session_state["story"]:
-        st.markdown(f"- {line}")
+    st.markdown(artifact("narrative"))
 
     st.subheader("🎯 Résultat final")
     emoji = {
@@ -159,10 +209,26 @@ if "story" in st.session_state:
         "report indéfini": "⏸️",
         "indécision": "🤷‍♂️"
     }
-    st.markdown(f"### {emoji.get(st.session_state['outcome'], '')} **{st.session_state['outcome'].upper()}**")
+    st.markdown(f"### {emoji.get(outcome, '')} **{outcome.upper()}**")
+    st.caption(f"🌱 Graine de la trajectoire : {seed} (à saisir dans la barre latérale pour la rejouer)")
+
+    # Fréquences observées sur un grand nombre de trajectoires du même profil
+    counts = artifact("batch_counts")
+    st.markdown(f"Sur {N_BATCH} trajectoires : " + " · ".join(
+        f"{emoji[name]} {name} **{counts[name] / N_BATCH:.1%}**" for name in OUTCOMES
+    ))
+    exact = artifact("exact_probabilities")
+    st.markdown("Probabilités exactes : " + " · ".join(
+        f"{emoji[name]} {name} **{exact[name]:.2%}**" for name in OUTCOMES
+    ))
+
+    # Et si ? Effet d'un cran sur chaque curseur, lu dans la table précalculée
+    with st.expander("🔀 Et si ? Profils voisins"):
+        for (name, delta), p in artifact("neighbours"):
+            st.markdown(f"- {PARAM_LABELS[name]} {delta:+d} → succès **{p:.2%}** ({p - exact['succès']:+.2%})")
 
     st.subheader("🧭 Score d'inertie structurelle")
-    s = st.session_state["inertia_scores"]
+    s = artifact("inertia_scores")
     ampl = s["amplificateur_visibilite"]
     st.markdown(f"""
     - Cognitif : **{s['cognitif']:.1f} / 100**  
@@ -187,46 +253,62 @@ if "story" in st.session_state:
 
     # Diagramme radar
     st.subheader("📈 Triangulation de l'inertie (psychique, matériel, structurel)")
-    labels = ['Cognitif', 'Conjoncturel', 'Structurel']
-    values = [s['cognitif'], s['conjoncturel'], s['structurel']]
-    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-    values += values[:1]
-    angles += angles[:1]
-
-    fig, ax = plt.subplots(figsize=(6,6), subplot_kw=dict(polar=True))
-    ax.fill(angles, values, color='skyblue', alpha=0.7)
-    ax.plot(angles, values, color='blue', linewidth=2)
-    ax.set_yticklabels([])
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(labels)
-    ax.set_title("Radar de l'inertie structurelle", fontsize=14, pad=20)
-    st.pyplot(fig)
+    if client_charts:
+        st.plotly_chart(charts.radar_plotly([s['cognitif'], s['conjoncturel'], s['structurel']]))
+    else:
+        st.image(artifact("radar"))
 
     # Frise chronologique de la progression décisionnelle
     st.subheader("📅 Frise chronologique de la progression décisionnelle")
-    progress = st.session_state["progress_history"]
-    months = list(range(1, len(progress)+1))
-    fig2, ax2 = plt.subplots(figsize=(10,3))
-    ax2.plot(months, progress, marker='o', color='tab:green')
-    ax2.axhline(y=8, color='tab:blue', linestyle='--', label="Seuil succès")
-    ax2.axhline(y=-5, color='tab:red', linestyle='--', label="Seuil échec")
-    ax2.set_xlabel("Mois")
-    ax2.set_ylabel("Progression décisionnelle")
-    ax2.set_xticks(months)
-    ax2.set_ylim(min(progress)-1, max(progress)+1)
-    ax2.legend()
-    ax2.grid(True)
-    st.pyplot(fig2)
+    if client_charts:
+        st.plotly_chart(charts.timeline_plotly(progress))
+    else:
+        st.image(artifact("timeline"))
+
+    # Éventail : quantiles mensuels de la progression sur les trajectoires batch, trajectoire simulée en surimpression
+    st.subheader(f"🌬️ Éventail de la progression sur {N_BATCH:,} trajectoires")
+    if client_charts:
+        st.plotly_chart(charts.fan_plotly(artifact("fan_quantiles"), progress))
+    else:
+        st.image(artifact("fan_chart"))
 
     # === NOUVELLE PARTIE POSTURE & CONSEILS ===
     st.subheader("🚀 Comment avancer malgré tout ?")
 
-    posture, advice = get_posture_and_advice(total_corrige)
+    posture, formatted_advice = artifact("posture")
     st.markdown(f"**Posture recommandée :**\n\n> {posture}")
-
-    formatted_advice = advice.replace('. ', '.  \n- ')
     st.markdown(f"**Conseils pratiques :**\n\n- {formatted_advice}")
 
+    plan = artifact("plan")
+    if plan and plan["changes"]:
+        changes = ", ".join(f"{PARAM_LABELS[name]} {before} → {after}" for name, before, after in plan["changes"])
+        st.markdown(f"**Changement minimal pour viser {TARGET_SUCCESS:.0%} de succès** "
+                    f"(→ {plan['value']:.0%}) : {changes}")
+    elif plan is None:
+        st.markdown(f"**Pas de plan minimal pour viser {TARGET_SUCCESS:.0%} de succès** "
+                    "(objectif hors d'atteinte, ou recherche trop longue pour ce profil).")
+
+    # Scénarios d'intervention côte à côte : issues, scores et éventails superposés
+    st.subheader("⚖️ Scénarios d'intervention côte à côte")
+    labels, _ = artifact("scenarios")
+    comparison = artifact("comparison")
+    scores = comparison["scores"]
+    st.table({
+        label: {
+            "succès (exact)": f"{comparison['probabilities'][i, 1]:.2%}",
+            "échec (exact)": f"{comparison['probabilities'][i, 2]:.2%}",
+            "cognitif": f"{scores['cognitif'][i]:.1f}",
+            "conjoncturel": f"{scores['conjoncturel'][i]:.1f}",
+            "structurel": f"{scores['structurel'][i]:.1f}",
+            "total corrigé": f"{scores['total'][i]:.1f}",
+        }
+        for i, label in enumerate(labels)
+    })
+    if client_charts:
+        st.plotly_chart(charts.scenarios_plotly(comparison["fan"], labels))
+    else:
+        st.image(artifact("comparison_chart"))
+
     # === NOUVELLE SECTION CROISSANCE PERSONNELLE ===
     st.subheader("🌱 Croissance personnelle malgré tout")
 
@@ -246,3 +328,50 @@ Pour cela :
 Célèbre chaque petite victoire — elles forment les pierres de ta route.  
 """
     st.markdown(growth_message)
+
+def show_distribution(snapshot, status, chart, fan_chart):
+    status.markdown(f"Sur **{snapshot['n']:,}** trajectoires : " + " · ".join(
+        f"{name} **{snapshot['frequencies'][name]:.2%}** [{low:.2%} ; {high:.2%}]"
+        for name, (low, high) in snapshot["intervals"].items()
+    ) + ("" if snapshot["done"] else " ⏳"))
+    histogram = snapshot["histogram"]
+    chart.bar_chart({"progression finale": histogram["values"], "trajectoires": histogram["counts"]},
+                    x="progression finale", y="trajectoires")
+    if client_charts:
+        # Clé par instantané : deux paquets successifs peuvent donner le même éventail
+        fan_chart.plotly_chart(charts.fan_plotly(snapshot["fan"]), key=f"distribution_fan_{snapshot['n']}")
+    else:
+        fan_chart.image(charts.fan_png(snapshot["fan"]))
+
+
+if "distribution" in st.session_state:
+    st.subheader("📊 Distribution des issues")
+    status = st.empty()
+    chart = st.empty()
+    fan_chart = st.empty()
+    profile, width = st.session_state["distribution"]
+
+    def stream():
+        # Affichage mis à jour à chaque paquet ; arrêt dès que tous les intervalles sont assez étroits
+        with metrics.timer("distribution"):
+            for snapshot in progressive_monte_carlo(profile, width=width, rng=BATCH_SEED):
+                if not snapshot["done"]:
+                    show_distribution(snapshot, status, chart, fan_chart)
+        return snapshot
+
+    # Dernier instantané épinglé pour la session (graine fixe : recalculable à l'identique)
+    snapshot = session.SESSIONS.result(st.session_state, ("distribution", profile, width), stream)
+    show_distribution(snapshot, status, chart, fan_chart)
+
+# Panneau de diagnostic : durées par étape, caches et taille de l'état, agrégés sur le processus
+metrics.end_run(run_start, st.session_state)
+if debug_panel:
+    with st.sidebar.expander("🩺 Métriques", expanded=True):
+        snapshot = metrics.REGISTRY.snapshot()
+        st.table({
+            name: {"appels": t["count"], "moyenne (ms)": round(t["mean"] * 1000, 2), "max (ms)": round(t["max"] * 1000, 2)}
+            for name, t in snapshot["timers"].items()
+        })
+        st.json({"caches": snapshot["caches"], "jauges": snapshot["gauges"], "compteurs": snapshot["counters"]})
+        st.download_button("⬇️ JSON", metrics.REGISTRY.to_json(), file_name="metrics.json", mime="application/json")
+        st.download_button("⬇️ Prometheus", metrics.REGISTRY.to_prometheus(), file_name="metrics.prom", mime="text/plain")
@@ -0,0 +1,22 @@
+# Moteur de simulation d'inertie décisionnelle, utilisable hors Streamlit.
+# Seul le cœur est importé ici ; cache, grille et exécution parallèle s'importent
+# explicitement (inertie.cache, inertie.grid, inertie.parallel) pour garder un démarrage rapide.
+
+from .agent import DecisionAgent, get_posture_and_advice
+from .batch import (
+    ENGINE_VERSION,
+    PARAM_NAMES,
+    OUTCOMES,
+    event_probabilities,
+    outcome_counts,
+    simulate_batch,
+)
+from .events import render_story
+from .markov import (
+    absorption_probabilities,
+    cross_check,
+    exact_distribution,
+    long_horizon_distribution,
+    transition_kernel,
+)
+from .rng import make_rng, new_seed, spawn_rngs, spawn_seeds
@@ -0,0 +1,180 @@
+# Modèle de décision biaisée, sans aucune dépendance d'interface : importable par les apps
+# Streamlit comme par les traitements batch (voir python -m inertie).
+
+import numpy as np
+
+from . import batch, markov, metrics
+from . import events as ev
+from .rng import make_rng
+
+
+class DecisionAgent:
+    def __init__(self, procrastination, pessimism, loss_aversion, scarcity, avoidance, pressure, invisibilisation, visibilite_coulisses):
+        self.procrastination = procrastination
+        self.pessimism = pessimism
+        self.loss_aversion = loss_aversion
+        self.scarcity = scarcity
+        self.avoidance = avoidance
+        self.pressure = pressure
+        self.invisibilisation = invisibilisation
+        self.visibilite_coulisses = visibilite_coulisses
+
+    @metrics.timed("simulate")
+    def simulate(self, rng=None, months=batch.HORIZON):
+        # rng : graine ou Generator propre à la session, pour rejouer une trajectoire à l'identique
+        rng = make_rng(rng)
+        outcome = "indécision"
+        decision_progress = 0
+        time_elapsed = 0
+        events = []
+        progress_history = []
+
+        while outcome == "indécision" and time_elapsed < months:
+            time_elapsed += 1
+
+            # Pessimisme bloque la projection
+            if rng.random() < self.pessimism / 15:
+                events.append(ev.INERTIE)
+                progress_history.append(decision_progress)
+                continue
+
+            # Procrastination : report
+            if rng.random() < self.procrastination / 12:
+                events.append(ev.REPORT)
+                progress_history.append(decision_progress)
+                continue
+
+            # Scarcity mindset : réduction du champ décisionnel
+            if rng.random() < self.scarcity / 12:
+                events.append(ev.STATU_QUO)
+                progress_history.append(decision_progress)
+                continue
+
+            # Invisibilisation : actions ignorées ou sabotées
+            if rng.random() < self.invisibilisation / 15:
+                decision_progress -= 1
+                events.append(ev.ACTION_INVISIBLE)
+                progress_history.append(decision_progress)
+                continue
+
+            # Auto-effacement si invisibilisation forte
+            if self.invisibilisation > 8 and rng.random() < 0.5:
+                events.append(ev.AUTO_EFFACEMENT)
+                progress_history.append(decision_progress)
+                continue
+
+            # Pression extérieure déclenche parfois l’action
+            if rng.random() < self.pressure / 10:
+                decision_progress += 3
+                events.append(ev.PRESSION)
+            else:
+                decision_progress += 1
+                events.append(ev.MICRO_ACTION)
+
+            # Aversion à la perte → doute après action
+            if rng.random() < self.loss_aversion / 15:
+                decision_progress -= 1
+                events[-1] |= ev.DOUTE
+
+            progress_history.append(decision_progress)
+
+            # Check résultat
+            if decision_progress >= 8:
+                outcome = "succès"
+            elif decision_progress <= -5:
+                outcome = "échec"
+
+        if time_elapsed >= months and outcome == "indécision":
+            outcome = "report indéfini"
+
+        # Trajectoire compacte : un code uint8 et une progression int8 par mois (int16 au-delà de 127 mois)
+        progress_dtype = np.int8 if months <= np.iinfo(np.int8).max else np.int16
+        return np.array(events, dtype=np.uint8), outcome, np.array(progress_history, dtype=progress_dtype)
+
+    def parameters(self):
+        return (self.procrastination, self.pessimism, self.loss_aversion, self.scarcity,
+                self.avoidance, self.pressure, self.invisibilisation, self.visibilite_coulisses)
+
+    def simulate_batch(self, n, rng=None, keep_progress=True, keep_events=False):
+        # Mode batch : n trajectoires indépendantes du même profil, vectorisées
+        return batch.simulate_batch(self.parameters(), n, rng=rng, keep_progress=keep_progress,
+                                    keep_events=keep_events)
+
+    def exact_distribution(self):
+        # Probabilités exactes des issues, par propagation de la chaîne de Markov (mois, progression)
+        return markov.exact_distribution(self.parameters())
+
+    def long_horizon_distribution(self, months):
+        # Issues à un horizon quelconque (des milliers de mois), par exponentiation de la matrice mensuelle
+        return markov.long_horizon_distribution(self.parameters(), months)
+
+    def absorption_probabilities(self):
+        # Issues à horizon infini : ce profil finit-il par décider, et dans quel sens ?
+        return markov.absorption_probabilities(self.parameters())
+
+    @metrics.timed("inertia_score")
+    def calculate_inertia_score(self):
+        # Score cognitif
+        score_cognitif = (self.procrastination + self.pessimism + self.loss_aversion + self.avoidance) * 2.5
+        # Score conjoncturel (pressure inverse)
+        score_conjoncturel = (self.scarcity + (10 - self.pressure)) * 5
+        # Score structurel
+        score_structurel = self.invisibilisation * 10
+
+        # Effet amplificateur de la visibilité : moins on voit, plus l'inertie structurelle augmente
+        # On définit un facteur multiplicateur de 1 (transparence totale) à 1.5 (opaque)
+        amplificateur_visibilite = 1 + (10 - self.visibilite_coulisses) * 0.05
+
+        # Application du multiplicateur sur la somme des scores
+        total_brut = score_cognitif + score_conjoncturel + score_structurel
+        total = total_brut * amplificateur_visibilite
+
+        return {
+            "cognitif": score_cognitif,
+            "conjoncturel": score_conjoncturel,
+            "structurel": score_structurel,
+            "total_brut": total_brut,
+            "total": total,
+            "amplificateur_visibilite": amplificateur_visibilite
+        }
+
+
+# Libellés des curseurs, pour les conseils rédigés
+PARAM_LABELS = {
+    "procrastination": "la procrastination",
+    "pessimism": "la vision pessimiste",
+    "loss_aversion": "l'aversion à la perte",
+    "scarcity": "la mentalité de rareté",
+    "avoidance": "l'évitement décisionnel",
+    "pressure": "la pression extérieure",
+    "invisibilisation": "l'invisibilisation structurelle",
+    "visibilite_coulisses": "la visibilité sur les coulisses",
+}
+
+
+def get_posture_and_advice(score, levers=None):
+    if score < 120:
+        posture = "Tu as un bon potentiel d'action. Reste vigilant et mobilise tes ressources."
+        advice = "Profite de cette dynamique pour avancer par petits pas, chercher du soutien et célébrer tes succès."
+    elif score < 180:
+        posture = "L’inertie est présente mais surmontable avec de la persévérance."
+        advice = ("Prépare-toi à batailler, mais garde l'espoir. "
+                  "Concentre-toi sur ce que tu peux contrôler et avance un pas à la fois.")
+    elif score < 240:
+        posture = "Les blocages sont sérieux, il faudra de la ténacité et une stratégie claire."
+        advice = ("Identifie clairement les moments où tu peux agir, "
+                  "et apprends à protéger ton énergie. Cultive ta résilience.")
+    else:
+        posture = "Le système pèse lourdement, mais tu incarnes la force qui peut résister."
+        advice = ("Sois patient·e, essaie de trouver des alliés, "
+                  "et garde la foi en ta capacité à faire bouger les lignes, même à petits pas.")
+
+    # Leviers concrets classés (voir inertie.optimizer.ranked_levers), à la place d'un conseil générique
+    for rank, lever in enumerate(levers or [], start=1):
+        verb = "augmenter" if lever["to"] > lever["from"] else "réduire"
+        if lever.get("objective", "succès") == "succès":
+            gain = f"+{lever['gain']:.1%} de chances de succès"
+        else:
+            gain = f"{lever['gain']:.0f} points d'inertie en moins"
+        advice += f" Levier n°{rank} : {verb} {PARAM_LABELS[lever['param']]} ({lever['from']} → {lever['to']}), {gain}."
+    return posture, advice
@@ -0,0 +1,182 @@
+# Moteur vectorisé : N agents indépendants simulés en parallèle sous forme de tableaux NumPy.
+# Reproduit mois par mois la cascade de DecisionAgent.simulate() des versions v3 à v5.
+
+import numpy as np
+
+from . import events as ev
+from .rng import make_rng
+
+# Ordre des paramètres, identique au constructeur de DecisionAgent
+PARAM_NAMES = (
+    "procrastination",
+    "pessimism",
+    "loss_aversion",
+    "scarcity",
+    "avoidance",
+    "pressure",
+    "invisibilisation",
+    "visibilite_coulisses",
+)
+
+# À incrémenter à chaque changement de la dynamique simulée (invalide les résultats en cache)
+ENGINE_VERSION = 1
+
+HORIZON = 12
+SEUIL_SUCCES = 8
+SEUIL_ECHEC = -5
+
+# Progression maximale atteignable : 7 puis une action sous pression (+3)
+PROGRESS_MAX = SEUIL_SUCCES + 2
+
+# Codes de résultat (uint8)
+INDEFINI, SUCCES, ECHEC = 0, 1, 2
+OUTCOMES = ("report indéfini", "succès", "échec")
+
+# Nombre de tirages uniformes consommés par mois et par agent
+N_DRAWS = 7
+
+
+def progress_values(months=HORIZON):
+    # Valeurs de progression possibles : au pire un recul d'un cran par mois
+    return np.arange(-months, PROGRESS_MAX + 1)
+
+
+def event_probabilities(params):
+    # params : tableau (..., 8) dans l'ordre de PARAM_NAMES
+    # Renvoie les 7 probabilités de la cascade, dans l'ordre des tirages de simulate() :
+    # pessimisme, procrastination, rareté, invisibilisation, auto-effacement, pression, aversion à la perte
+    params = np.asarray(params, dtype=np.float64)
+    procrastination = params[..., 0]
+    pessimism = params[..., 1]
+    loss_aversion = params[..., 2]
+    scarcity = params[..., 3]
+    pressure = params[..., 5]
+    invisibilisation = params[..., 6]
+    return np.stack([
+        pessimism / 15,
+        procrastination / 12,
+        scarcity / 12,
+        invisibilisation / 15,
+        np.where(invisibilisation > 8, 0.5, 0.0),
+        pressure / 10,
+        loss_aversion / 15,
+    ], axis=-1)
+
+
+def outcome_counts(outcome):
+    counts = np.bincount(outcome, minlength=len(OUTCOMES))
+    return {name: int(counts[code]) for code, name in enumerate(OUTCOMES)}
+
+
+def simulate_batch(params, n, rng=None, months=HORIZON, keep_progress=True, keep_events=False, uniforms=None,
+                   progress_histogram=False, sampling=None):
+    # params : profil unique (8,) ou un profil par agent (n, 8)
+    # rng : graine, SeedSequence ou Generator (None = tirage frais)
+    # uniforms : tirages imposés (months, N_DRAWS, n), à la place de rng (voir inertie.variance)
+    # progress_histogram : comptes (months, valeurs de progress_values) accumulés mois par mois,
+    # sans garder la matrice des trajectoires
+    # sampling : probabilités des 7 tirages (7,) ou (n, 7) sous lesquelles simuler à la place de
+    # celles du profil (échantillonnage préférentiel, voir inertie.rare) ; renvoie alors le log du
+    # rapport de vraisemblance de chaque trajectoire et, par tirage, ses utilisations et succès
+    rng = make_rng(rng)
+    # Disposition (tirage, agent) : chaque ligne de tirages est contiguë en mémoire
+    p = event_probabilities(params).astype(np.float32).T
+    if p.ndim == 1:
+        p = p[:, None]
+    if sampling is not None:
+        q = np.asarray(sampling, dtype=np.float32).T
+        q = q[:, None] if q.ndim == 1 else q
+        # Log-rapports p/q (succès) et (1-p)/(1-q) (échec) par tirage ; nuls là où q = p
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_hit = np.where(q == p, 0.0, np.log(p.astype(np.float64) / q))
+            log_miss = np.where(q == p, 0.0, np.log((1 - p.astype(np.float64)) / (1 - q)))
+        p = q
+        log_weight = np.zeros(n)
+        draw_uses = np.zeros((N_DRAWS, n), dtype=np.int16)
+        draw_hits = np.zeros((N_DRAWS, n), dtype=np.int16)
+
+    # Types compacts tant que l'horizon le permet (au pire un recul d'un cran par mois)
+    progress_dtype = np.int8 if months <= np.iinfo(np.int8).max else np.int16
+    duration_dtype = np.uint8 if months <= np.iinfo(np.uint8).max else np.uint16
+    progress = np.zeros(n, dtype=progress_dtype)
+    active = np.ones(n, dtype=bool)
+    outcome = np.full(n, INDEFINI, dtype=np.uint8)
+    # Durée de la trajectoire : mois d'absorption, ou l'horizon pour les reports indéfinis
+    duration = np.full(n, months, dtype=duration_dtype)
+    history = np.empty((n, months), dtype=progress_dtype) if keep_progress else None
+    # Codes d'événements (voir inertie.events) ; AUCUN pour les mois après absorption
+    event_codes = np.zeros((n, months), dtype=np.uint8) if keep_events else None
+    n_values = months + PROGRESS_MAX + 1
+    histogram = np.zeros((months, n_values), dtype=np.int64) if progress_histogram else None
+
+    for month in range(months):
+        u = rng.random((N_DRAWS, n), dtype=np.float32) if uniforms is None else uniforms[month]
+
+        # Pessimisme, procrastination, rareté : le mois s'arrête sans effet
+        rest = active & (u[0] >= p[0])
+        rest &= u[1] >= p[1]
+        rest &= u[2] >= p[2]
+        stopped = active & ~rest
+
+        # Invisibilisation : recul d'un cran
+        invisible = rest & (u[3] < p[3])
+        rest &= ~invisible
+
+        # Auto-effacement si invisibilisation forte, sinon action
+        act = rest & (u[4] >= p[4])
+
+        # Action : +3 sous pression, +1 sinon, -1 en cas de doute post-action
+        step = (u[5] < p[5]).view(np.int8) * np.int8(2) + np.int8(1)
+        step -= (u[6] < p[6]).view(np.int8)
+        step *= act.view(np.int8)
+        step -= invisible.view(np.int8)
+        progress += step
+
+        if event_codes is not None:
+            code = np.where(u[5] < p[5], ev.PRESSION, ev.MICRO_ACTION).astype(np.uint8)
+            code |= (u[6] < p[6]).view(np.uint8) * np.uint8(ev.DOUTE)
+            code[~act] = ev.AUCUN
+            code[invisible] = ev.ACTION_INVISIBLE
+            code[rest & ~act] = ev.AUTO_EFFACEMENT
+            first = np.where(u[0] < p[0], ev.INERTIE, np.where(u[1] < p[1], ev.REPORT, ev.STATU_QUO))
+            code[stopped] = first[stopped]
+            event_codes[:, month] = code
+
+        if sampling is not None:
+            # Seuls les tirages effectivement consultés par la cascade entrent dans le rapport
+            hits = u < p
+            used = np.empty((N_DRAWS, n), dtype=bool)
+            used[0] = active
+            for draw in (1, 2, 3, 4):
+                used[draw] = used[draw - 1] & ~hits[draw - 1]
+            used[5] = act
+            used[6] = act
+            log_weight += np.where(used, np.where(hits, log_hit, log_miss), 0.0).sum(axis=0)
+            draw_uses += used
+            draw_hits += used & hits
+
+        # Comme dans simulate(), le résultat n'est vérifié qu'après une action
+        success = act & (progress >= SEUIL_SUCCES)
+        failure = act & (progress <= SEUIL_ECHEC)
+        outcome[success] = SUCCES
+        outcome[failure] = ECHEC
+        absorbed = success | failure
+        duration[absorbed] = month + 1
+        active &= ~absorbed
+
+        if history is not None:
+            history[:, month] = progress
+        if histogram is not None:
+            histogram[month] = np.bincount(progress.astype(np.intp) + months, minlength=n_values)
+
+    result = {
+        "counts": outcome_counts(outcome),
+        "outcome": outcome,
+        "duration": duration,
+        "progress": history,
+        "events": event_codes,
+        "histogram": histogram,
+    }
+    if sampling is not None:
+        result.update(log_weight=log_weight, draw_uses=draw_uses, draw_hits=draw_hits)
+    return result
@@ -0,0 +1,207 @@
+# Banc de mesure : moteur (trajectoire unique, batch), score d'inertie, rendu des graphiques et
+# exécution complète de chaque app-v*.py via l'AppTest headless de Streamlit.
+# Les résultats s'enregistrent en JSON ; comparés à une référence, ils signalent les régressions
+# au-delà d'une tolérance relative.
+
+import contextlib
+import glob
+import json
+import os
+import platform
+import statistics
+import time
+
+import numpy as np
+
+from .batch import ENGINE_VERSION
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE = (5, 5, 5, 5, 5, 5, 5, 5)
+BATCH_SIZES = (10_000, 100_000, 1_000_000)
+SCORE_ROWS = 1_000_000
+DEFAULT_TOLERANCE = 0.2
+SUITES = ("engine", "scoring", "charts", "apps")
+
+
+def _measure(function, repeat):
+    # Durées d'exécution (secondes) après un appel de chauffe
+    function()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _latency(durations):
+    # Médiane en secondes : plus petite = meilleure
+    return {"value": statistics.median(durations), "unit": "s", "higher_is_better": False}
+
+
+def _throughput(items, durations):
+    return {"value": items / statistics.median(durations), "unit": "1/s", "higher_is_better": True}
+
+
+def bench_engine(quick=False):
+    from .agent import DecisionAgent
+    from .batch import simulate_batch
+
+    agent = DecisionAgent(*PROFILE)
+    rng = np.random.default_rng(0)
+    # Une trajectoire dure quelques µs : on chronomètre des paquets de 100 appels
+    calls = 100
+    durations = _measure(lambda: [agent.simulate(rng) for _ in range(calls)], 10 if quick else 50)
+    results = {"simulate_latency": _latency([d / calls for d in durations])}
+    for n in BATCH_SIZES[:2] if quick else BATCH_SIZES:
+        durations = _measure(lambda: simulate_batch(PROFILE, n, rng=rng, keep_progress=False), 3 if quick else 5)
+        results[f"batch_throughput_{n}"] = _throughput(n, durations)
+    return results
+
+
+def bench_scoring(quick=False):
+    from .agent import DecisionAgent
+    from .scoring import inertia_scores
+
+    agent = DecisionAgent(*PROFILE)
+    calls = 1000
+    durations = _measure(lambda: [agent.calculate_inertia_score() for _ in range(calls)], 5 if quick else 20)
+    results = {"inertia_score_rows": _throughput(calls, durations)}
+    rows = SCORE_ROWS // 10 if quick else SCORE_ROWS
+    profiles = np.random.default_rng(0).integers(0, 11, size=(rows, len(PROFILE)))
+    durations = _measure(lambda: inertia_scores(profiles), 3 if quick else 5)
+    results["inertia_scores_vectorized_rows"] = _throughput(rows, durations)
+    return results
+
+
+def bench_charts(quick=False):
+    from . import charts
+
+    # Rendu réel : on appelle les fonctions internes, hors cache d'images
+    values = [50.0, 70.0, 50.0]
+    progress = [0, 1, 1, 4, 3, 3, 4, 5, 5, 6, 7, 8]
+    repeat = 3 if quick else 10
+    return {
+        "render_radar": _latency(_measure(lambda: charts._radar_png(values), repeat)),
+        "render_timeline": _latency(_measure(lambda: charts._timeline_png(progress), repeat)),
+        "render_cached": _latency(_measure(lambda: charts.timeline_png(progress), repeat)),
+    }
+
+
+def _app_run(path):
+    # Premier affichage puis clic sur « Lancer la simulation », dans une session neuve.
+    # app-v2 n'a pas de bouton (tout est calculé à chaque exécution) : simple rerun à la place.
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(path, default_timeout=120)
+    start = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    if len(app.button):
+        app.button[0].click()
+    app.run()
+    click = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(f"{os.path.basename(path)} : {app.exception[0].message}")
+    return first, click
+
+
+def _clear_caches():
+    # Caches de processus vidés : la mesure à froid ne profite pas des exécutions précédentes
+    from . import cache, charts, optimizer
+
+    cache.RESULTS.clear()
+    charts.RENDERS.clear()
+    optimizer._memo = None
+
+
+@contextlib.contextmanager
+def _without_store():
+    # Registre persistant désactivé, comme avec INERTIE_STORE="" : rien n'est relu sur disque
+    from . import cache, store
+
+    saved = store.DEFAULT_PATH, cache.STORE
+    store.DEFAULT_PATH, cache.STORE = "", None
+    try:
+        yield
+    finally:
+        store.DEFAULT_PATH, cache.STORE = saved
+
+
+def bench_apps(quick=False):
+    # À froid : caches vidés avant chaque mesure ; à chaud : même exécution relancée aussitôt
+    results = {}
+    repeat = 1 if quick else 3
+    with _without_store():
+        for path in sorted(glob.glob(os.path.join(REPO_ROOT, "app-v*.py"))):
+            name = os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+            # Première exécution à part : imports encore froids
+            _app_run(path)
+            cold, warm = [], []
+            for _ in range(repeat):
+                _clear_caches()
+                cold.append(_app_run(path))
+                warm.append(_app_run(path))
+            for label, runs in (("cold", cold), ("warm", warm)):
+                results[f"{name}_{label}_first_run"] = _latency([first for first, _ in runs])
+                results[f"{name}_{label}_click_run"] = _latency([click for _, click in runs])
+    return results
+
+
+BENCHMARKS = {
+    "engine": bench_engine,
+    "scoring": bench_scoring,
+    "charts": bench_charts,
+    "apps": bench_apps,
+}
+
+
+def environment():
+    import streamlit
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "streamlit": streamlit.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "engine_version": ENGINE_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run(suites=SUITES, quick=False):
+    results = {}
+    for suite in suites:
+        for name, result in BENCHMARKS[suite](quick).items():
+            results[f"{suite}.{name}"] = result
+    return {"environment": environment(), "results": results}
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    # Écart relatif orienté : positif = plus lent qu'à la référence
+    comparison = {}
+    regressions = []
+    for name, result in report["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None or not reference["value"]:
+            continue
+        ratio = result["value"] / reference["value"]
+        slowdown = 1 / ratio - 1 if result["higher_is_better"] else ratio - 1
+        comparison[name] = {"baseline": reference["value"], "value": result["value"], "slowdown": slowdown}
+        if slowdown > tolerance:
+            regressions.append(name)
+    return comparison, regressions
+
+
+def load(path):
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)
+
+
+def save(report, path):
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump(report, out, ensure_ascii=False, indent=2)
+    return path
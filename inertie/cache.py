@@ -0,0 +1,104 @@
+# Cache de résultats partagé par toutes les sessions du processus Streamlit.
+# Clé : (type de calcul et ses arguments, profil, graine, version du moteur) ; taille bornée, éviction LRU.
+# Optionnellement adossé au registre persistant (inertie.store) : un résultat absent du cache
+# est d'abord cherché sur disque, et tout nouveau calcul y est enregistré.
+
+import threading
+from collections import OrderedDict
+
+from .batch import ENGINE_VERSION
+
+DEFAULT_MAXSIZE = 4096
+
+
+class LRUCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # Calcul hors verrou : deux sessions peuvent calculer la même clé, la seconde écrase la première
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+# Instance unique par processus, partagée entre les sessions
+RESULTS = LRUCache()
+
+# Registre persistant branché par attach_store (None : cache en mémoire seulement)
+STORE = None
+
+# Absence de résultat enregistré, distincte d'un résultat None (ex. pas de plan d'intervention)
+_MISSING = object()
+
+
+def result_key(kind, params, seed=None):
+    return (kind, tuple(int(p) for p in params), seed, ENGINE_VERSION)
+
+
+def qualified_kind(kind, args=()):
+    # Arguments du calcul autres que profil et graine (taille d'échantillon, cible...) inscrits dans
+    # le type, ex. "batch:100000" : un changement de réglage ne relit pas un résultat périmé
+    return kind if not args else f"{kind}:{','.join(str(arg) for arg in args)}"
+
+
+def cached(kind, params, compute, seed=None, stochastic=False, args=()):
+    # Un calcul aléatoire sans graine n'est pas reproductible : il n'est pas mis en cache.
+    # Les valeurs sont partagées entre sessions et ne doivent pas être modifiées par l'appelant.
+    kind = qualified_kind(kind, args)
+    if STORE is not None:
+        compute = _persistent(kind, params, seed, compute, lookup=not (stochastic and seed is None))
+    if stochastic and seed is None:
+        return compute()
+    return RESULTS.get_or_compute(result_key(kind, params, seed), compute)
+
+
+def _persistent(kind, params, seed, compute, lookup=True):
+    # Lecture sur disque avant calcul ; chaque calcul (même aléatoire sans graine) est enregistré
+    store = STORE
+
+    def load_or_compute():
+        value = store.get(kind, params, seed, default=_MISSING) if lookup else _MISSING
+        if value is _MISSING:
+            value = compute()
+            store.put(kind, params, seed, value)
+        return value
+    return load_or_compute
+
+
+def attach_store(store, warm=True):
+    # Branche le registre et, par défaut, précharge les résultats les plus récents dans le cache
+    global STORE
+    if STORE is store:
+        return
+    STORE = store
+    if warm:
+        for kind, params, seed, value in store.recent(RESULTS.maxsize):
+            RESULTS.put(result_key(kind, params, seed), value)
@@ -0,0 +1,207 @@
+# Rendu du radar et de la frise chronologique, sans l'état global de pyplot.
+# Les images PNG sont mises en cache par valeurs tracées (partagé entre sessions) et chaque
+# Figure est libérée explicitement après rendu. Variante plotly : rendu côté navigateur.
+# matplotlib et plotly ne sont importés qu'au premier graphique demandé.
+
+import io
+
+import numpy as np
+
+from .batch import SEUIL_ECHEC, SEUIL_SUCCES
+from . import metrics
+from .cache import LRUCache
+
+RADAR_LABELS = ['Cognitif', 'Conjoncturel', 'Structurel']
+
+# Couleurs des scénarios superposés (cycle tab10 de matplotlib, et en RVB pour plotly)
+SCENARIO_COLORS = ['tab:green', 'tab:orange', 'tab:purple', 'tab:brown', 'tab:pink', 'tab:olive']
+SCENARIO_RGB = ["44, 160, 44", "255, 127, 14", "148, 103, 189", "140, 86, 75", "227, 119, 194", "188, 189, 34"]
+
+# Images rendues, indexées par les valeurs tracées
+RENDERS = LRUCache(maxsize=512)
+
+
+def _to_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    # Figure hors pyplot : aucun registre global, on vide les artistes pour libérer la mémoire tout de suite
+    fig.clear()
+    return buffer.getvalue()
+
+
+@metrics.timed("render_radar")
+def _radar_png(values):
+    from matplotlib.figure import Figure
+
+    angles = np.linspace(0, 2 * np.pi, len(RADAR_LABELS), endpoint=False).tolist()
+    values = list(values) + list(values[:1])
+    angles += angles[:1]
+
+    fig = Figure(figsize=(6, 6))
+    ax = fig.add_subplot(polar=True)
+    ax.fill(angles, values, color='skyblue', alpha=0.7)
+    ax.plot(angles, values, color='blue', linewidth=2)
+    ax.set_yticklabels([])
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(RADAR_LABELS)
+    ax.set_title("Radar de l'inertie structurelle", fontsize=14, pad=20)
+    return _to_png(fig)
+
+
+@metrics.timed("render_timeline")
+def _timeline_png(progress):
+    from matplotlib.figure import Figure
+
+    months = list(range(1, len(progress) + 1))
+    fig = Figure(figsize=(10, 3))
+    ax = fig.add_subplot()
+    ax.plot(months, progress, marker='o', color='tab:green')
+    ax.axhline(y=SEUIL_SUCCES, color='tab:blue', linestyle='--', label="Seuil succès")
+    ax.axhline(y=SEUIL_ECHEC, color='tab:red', linestyle='--', label="Seuil échec")
+    ax.set_xlabel("Mois")
+    ax.set_ylabel("Progression décisionnelle")
+    ax.set_xticks(months)
+    ax.set_ylim(min(progress) - 1, max(progress) + 1)
+    ax.legend()
+    ax.grid(True)
+    return _to_png(fig)
+
+
+@metrics.timed("render_fan")
+def _fan_png(quantiles, progress):
+    from matplotlib.figure import Figure
+
+    # quantiles : (5, months) dans l'ordre 5 %, 25 %, 50 %, 75 %, 95 %
+    months = list(range(1, quantiles.shape[1] + 1))
+    fig = Figure(figsize=(10, 3))
+    ax = fig.add_subplot()
+    ax.fill_between(months, quantiles[0], quantiles[4], step="mid", color='tab:green', alpha=0.15, label="5-95 %")
+    ax.fill_between(months, quantiles[1], quantiles[3], step="mid", color='tab:green', alpha=0.35, label="25-75 %")
+    ax.step(months, quantiles[2], where="mid", color='tab:green', linewidth=2, label="Médiane")
+    if progress is not None:
+        ax.plot(months[:len(progress)], progress, marker='o', color='black', linewidth=1, label="Trajectoire simulée")
+    ax.axhline(y=SEUIL_SUCCES, color='tab:blue', linestyle='--', label="Seuil succès")
+    ax.axhline(y=SEUIL_ECHEC, color='tab:red', linestyle='--', label="Seuil échec")
+    ax.set_xlabel("Mois")
+    ax.set_ylabel("Progression décisionnelle")
+    ax.set_xticks(months)
+    ax.legend(loc="upper left", fontsize=8)
+    ax.grid(True)
+    return _to_png(fig)
+
+
+@metrics.timed("render_scenarios")
+def _scenarios_png(fans, labels):
+    from matplotlib.figure import Figure
+
+    # fans : (K, 5, months), un éventail par scénario ; médiane et bande 25-75 % superposées
+    months = list(range(1, fans.shape[-1] + 1))
+    fig = Figure(figsize=(10, 3))
+    ax = fig.add_subplot()
+    for i, (quantiles, label) in enumerate(zip(fans, labels)):
+        color = SCENARIO_COLORS[i % len(SCENARIO_COLORS)]
+        ax.fill_between(months, quantiles[1], quantiles[3], step="mid", color=color, alpha=0.15)
+        ax.step(months, quantiles[2], where="mid", color=color, linewidth=2, label=label)
+    ax.axhline(y=SEUIL_SUCCES, color='tab:blue', linestyle='--', linewidth=1)
+    ax.axhline(y=SEUIL_ECHEC, color='tab:red', linestyle='--', linewidth=1)
+    ax.set_xlabel("Mois")
+    ax.set_ylabel("Progression décisionnelle")
+    ax.set_xticks(months)
+    ax.legend(loc="upper left", fontsize=8)
+    ax.grid(True)
+    return _to_png(fig)
+
+
+def radar_png(values):
+    # values : scores cognitif, conjoncturel, structurel
+    key = ("radar",) + tuple(float(v) for v in values)
+    return RENDERS.get_or_compute(key, lambda: _radar_png(values))
+
+
+def timeline_png(progress):
+    key = ("timeline",) + tuple(int(p) for p in progress)
+    return RENDERS.get_or_compute(key, lambda: _timeline_png(progress))
+
+
+def fan_png(quantiles, progress=None):
+    quantiles = np.asarray(quantiles)
+    progress = None if progress is None else tuple(int(p) for p in progress)
+    key = ("fan", quantiles.shape[1]) + tuple(quantiles.ravel().tolist()) + (progress,)
+    return RENDERS.get_or_compute(key, lambda: _fan_png(quantiles, progress))
+
+
+def scenarios_png(fans, labels):
+    fans = np.asarray(fans)
+    key = ("scenarios", fans.shape) + tuple(fans.ravel().tolist()) + tuple(labels)
+    return RENDERS.get_or_compute(key, lambda: _scenarios_png(fans, labels))
+
+
+def radar_plotly(values):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scatterpolar(
+        r=list(values) + list(values[:1]),
+        theta=RADAR_LABELS + RADAR_LABELS[:1],
+        fill="toself",
+        line=dict(color="blue", width=2),
+        fillcolor="rgba(135, 206, 235, 0.7)",
+    ))
+    fig.update_layout(title="Radar de l'inertie structurelle",
+                      polar=dict(radialaxis=dict(showticklabels=False)), showlegend=False)
+    return fig
+
+
+def timeline_plotly(progress):
+    import plotly.graph_objects as go
+
+    months = list(range(1, len(progress) + 1))
+    fig = go.Figure(go.Scatter(x=months, y=[int(p) for p in progress], mode="lines+markers",
+                               line=dict(color="green"), name="Progression"))
+    fig.add_hline(y=SEUIL_SUCCES, line_dash="dash", line_color="blue", annotation_text="Seuil succès")
+    fig.add_hline(y=SEUIL_ECHEC, line_dash="dash", line_color="red", annotation_text="Seuil échec")
+    fig.update_layout(xaxis=dict(title="Mois", tickmode="linear", dtick=1),
+                      yaxis=dict(title="Progression décisionnelle"), height=300)
+    return fig
+
+
+def fan_plotly(quantiles, progress=None):
+    import plotly.graph_objects as go
+
+    quantiles = np.asarray(quantiles).tolist()
+    months = list(range(1, len(quantiles[0]) + 1))
+    fig = go.Figure()
+    for low, high, opacity, name in ((0, 4, 0.15, "5-95 %"), (1, 3, 0.35, "25-75 %")):
+        fig.add_trace(go.Scatter(x=months, y=quantiles[low], line=dict(width=0, shape="hvh"), showlegend=False,
+                                 hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=months, y=quantiles[high], line=dict(width=0, shape="hvh"), fill="tonexty",
+                                 fillcolor=f"rgba(44, 160, 44, {opacity})", name=name))
+    fig.add_trace(go.Scatter(x=months, y=quantiles[2], line=dict(color="green", width=2, shape="hvh"), name="Médiane"))
+    if progress is not None:
+        fig.add_trace(go.Scatter(x=months[:len(progress)], y=[int(p) for p in progress], mode="lines+markers",
+                                 line=dict(color="black", width=1), name="Trajectoire simulée"))
+    fig.add_hline(y=SEUIL_SUCCES, line_dash="dash", line_color="blue", annotation_text="Seuil succès")
+    fig.add_hline(y=SEUIL_ECHEC, line_dash="dash", line_color="red", annotation_text="Seuil échec")
+    fig.update_layout(xaxis=dict(title="Mois", tickmode="linear", dtick=1),
+                      yaxis=dict(title="Progression décisionnelle"), height=300)
+    return fig
+
+
+def scenarios_plotly(fans, labels):
+    import plotly.graph_objects as go
+
+    fans = np.asarray(fans).tolist()
+    months = list(range(1, len(fans[0][0]) + 1))
+    fig = go.Figure()
+    for i, (quantiles, label) in enumerate(zip(fans, labels)):
+        color = SCENARIO_RGB[i % len(SCENARIO_RGB)]
+        fig.add_trace(go.Scatter(x=months, y=quantiles[1], line=dict(width=0, shape="hvh"), showlegend=False,
+                                 hoverinfo="skip", legendgroup=label))
+        fig.add_trace(go.Scatter(x=months, y=quantiles[3], line=dict(width=0, shape="hvh"), fill="tonexty",
+                                 fillcolor=f"rgba({color}, 0.15)", showlegend=False, legendgroup=label))
+        fig.add_trace(go.Scatter(x=months, y=quantiles[2], line=dict(color=f"rgb({color})", width=2, shape="hvh"),
+                                 name=label, legendgroup=label))
+    fig.add_hline(y=SEUIL_SUCCES, line_dash="dash", line_color="blue", annotation_text="Seuil succès")
+    fig.add_hline(y=SEUIL_ECHEC, line_dash="dash", line_color="red", annotation_text="Seuil échec")
+    fig.update_layout(xaxis=dict(title="Mois", tickmode="linear", dtick=1),
+                      yaxis=dict(title="Progression décisionnelle"), height=300)
+    return fig
@@ -0,0 +1,257 @@
+# Point d'entrée console pour les traitements batch : python -m inertie <commande>.
+# Les modules lourds ne sont importés que par la commande qui en a besoin.
+
+import argparse
+import json
+import re
+import sys
+
+from .batch import HORIZON, OUTCOMES
+
+
+def parse_profile(text):
+    values = [int(v) for v in text.split(",")]
+    if len(values) != 8:
+        raise argparse.ArgumentTypeError("un profil compte 8 curseurs séparés par des virgules")
+    return values
+
+
+def parse_months(text):
+    months = int(text)
+    if months < 0:
+        raise argparse.ArgumentTypeError(f"horizon négatif : {months} mois")
+    return months
+
+
+def parse_count(text):
+    count = int(text)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"effectif non positif : {count}")
+    return count
+
+
+def cmd_simulate(args):
+    from .parallel import simulate_parallel
+
+    result = simulate_parallel(args.profile, args.n, seed=args.seed, workers=args.workers)
+    summary = {"seed": result["seed"], "n": result["n"], "counts": result["counts"]}
+    if args.store:
+        from .store import open_store
+
+        open_store().put_many([("parallel", args.profile, result["seed"], summary)])
+    return summary
+
+
+def cmd_exact(args):
+    from .markov import absorption_probabilities, exact_distribution, long_horizon_distribution
+
+    if args.limit:
+        return absorption_probabilities(args.profile)
+    if args.months != HORIZON:
+        return long_horizon_distribution(args.profile, args.months)
+    return exact_distribution(args.profile, keep_progress=False)["probabilities"]
+
+
+def cmd_build_table(args):
+    from .grid import DEFAULT_PATH, build_table
+
+    return {"path": build_table(args.path or DEFAULT_PATH)}
+
+
+def cmd_score(args):
+    from .scoring import score_file
+
+    return score_file(args.source, args.destination, block_size=args.block_size)
+
+
+def cmd_sensitivity(args):
+    from .sensitivity import sensitivity_analysis
+
+    return sensitivity_analysis(args.n, rng=args.seed, n_bootstrap=args.bootstrap)
+
+
+def cmd_bench(args):
+    from . import bench
+
+    unknown = set(args.suites) - set(bench.SUITES)
+    if unknown:
+        raise SystemExit(f"suites inconnues : {', '.join(sorted(unknown))}")
+    report = bench.run(args.suites or bench.SUITES, quick=args.quick)
+    if args.baseline:
+        report["comparison"], report["regressions"] = bench.compare(report, bench.load(args.baseline),
+                                                                    tolerance=args.tolerance)
+    if args.save:
+        bench.save(report, args.save)
+    return report
+
+
+def cmd_loadtest(args):
+    from .loadtest import load_test
+
+    return load_test(args.app, levels=args.sessions, steps=args.steps, mode=args.mode, seed=args.seed)
+
+
+def cmd_population(args):
+    from .population import simulate_population, small_world_graph
+
+    graph = small_world_graph(args.n, degree=args.degree, rewire=args.rewire, rng=args.seed)
+    result = simulate_population(args.profile, graph, months=args.months, rng=args.seed,
+                                 pressure_gain=args.pressure_gain, invisibilisation_gain=args.invisibilisation_gain)
+    return {"counts": result["counts"], "curves": {name: curve.tolist() for name, curve in result["curves"].items()}}
+
+
+def cmd_compare(args):
+    from .variance import compare_profiles
+
+    return compare_profiles(args.profile_a, args.profile_b, args.n, method=args.method, rng=args.seed,
+                            months=args.months, replicates=args.replicates)
+
+
+def cmd_scenarios(args):
+    from .fan import QUANTILES
+    from .scenarios import compare_scenarios
+
+    result = compare_scenarios(args.profiles, args.n, rng=args.seed, months=args.months)
+    return [
+        {
+            "profile": profile.tolist(),
+            "probabilities": dict(zip(OUTCOMES, result["probabilities"][i].tolist())),
+            "scores": {name: float(values[i]) for name, values in result["scores"].items()},
+            "fan": {f"q{round(q * 100):02d}": band for q, band in zip(QUANTILES, result["fan"][i].tolist())},
+            **({"frequencies": dict(zip(OUTCOMES, result["frequencies"][i].tolist()))} if args.n else {}),
+        }
+        for i, profile in enumerate(result["profiles"])
+    ]
+
+
+def cmd_rare(args):
+    from .rare import rare_event_probability
+
+    return rare_event_probability(args.profile, args.outcome, args.n, rng=args.seed, months=args.months,
+                                  pilot=args.pilot)
+
+
+CONDITION = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|<|>|=)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def parse_condition(text):
+    match = CONDITION.match(text)
+    if match is None:
+        raise argparse.ArgumentTypeError(f"condition attendue sous la forme curseur>=valeur : {text}")
+    name, operator, value = match.groups()
+    return name, operator, float(value) if "." in value else int(value)
+
+
+def cmd_runs(args):
+    from .store import open_store
+
+    rows = open_store(args.path) if args.path else open_store()
+    return rows.query(args.conditions, kind=args.kind, limit=args.limit, all_versions=args.all_versions)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m inertie",
+                                     description="Simulateur d'inertie décisionnelle en mode batch.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulate = commands.add_parser("simulate", help="Monte-Carlo sur un profil")
+    simulate.add_argument("profile", type=parse_profile, help="8 curseurs, ex. 5,5,5,5,5,5,5,5")
+    simulate.add_argument("-n", type=parse_count, default=1_000_000)
+    simulate.add_argument("--seed", type=int)
+    simulate.add_argument("--workers", type=parse_count, default=1)
+    simulate.add_argument("--store", action="store_true", help="enregistre l'agrégat dans le registre des simulations")
+    simulate.set_defaults(handler=cmd_simulate)
+
+    exact = commands.add_parser("exact", help="probabilités exactes d'un profil")
+    exact.add_argument("profile", type=parse_profile)
+    exact.add_argument("--months", type=parse_months, default=HORIZON, help="horizon en mois (exponentiation au-delà de 12)")
+    exact.add_argument("--limit", action="store_true", help="horizon infini : probabilités d'absorption")
+    exact.set_defaults(handler=cmd_exact)
+
+    table = commands.add_parser("build-table", help="construit la table précalculée de la grille")
+    table.add_argument("path", nargs="?", help="par défaut outcome_table-v<version du moteur>.npy à la racine du dépôt")
+    table.set_defaults(handler=cmd_build_table)
+
+    score = commands.add_parser("score", help="note un fichier de profils CSV/JSONL en flux")
+    score.add_argument("source")
+    score.add_argument("destination")
+    score.add_argument("--block-size", type=int, default=32 << 20, help="octets lus par bloc (CSV et JSONL)")
+    score.set_defaults(handler=cmd_score)
+
+    sensitivity = commands.add_parser("sensitivity", help="indices de Sobol des huit curseurs")
+    sensitivity.add_argument("-n", type=parse_count, default=4096, help="taille des matrices de Saltelli")
+    sensitivity.add_argument("--seed", type=int)
+    sensitivity.add_argument("--bootstrap", type=int, default=200)
+    sensitivity.set_defaults(handler=cmd_sensitivity)
+
+    bench = commands.add_parser("bench", help="mesures de performance, comparées à une référence JSON")
+    bench.add_argument("suites", nargs="*", help="engine, scoring, charts, apps (par défaut toutes)")
+    bench.add_argument("--quick", action="store_true", help="moins de répétitions et de tailles")
+    bench.add_argument("--baseline", help="rapport JSON de référence")
+    bench.add_argument("--tolerance", type=float, default=0.2, help="ralentissement relatif toléré")
+    bench.add_argument("--save", help="enregistre le rapport (nouvelle référence)")
+    bench.set_defaults(handler=cmd_bench)
+
+    population = commands.add_parser("population", help="population en interaction sur un graphe social")
+    population.add_argument("profile", type=parse_profile)
+    population.add_argument("-n", type=parse_count, default=1_000_000, help="nombre d'agents")
+    population.add_argument("--months", type=parse_months, default=120)
+    population.add_argument("--degree", type=int, default=10, help="voisins par agent")
+    population.add_argument("--rewire", type=float, default=0.1, help="part de liens redirigés au hasard")
+    population.add_argument("--pressure-gain", type=float, default=3.0)
+    population.add_argument("--invisibilisation-gain", type=float, default=3.0)
+    population.add_argument("--seed", type=int)
+    population.set_defaults(handler=cmd_population)
+
+    compare = commands.add_parser("compare", help="différence d'issues entre deux profils, à variance réduite")
+    compare.add_argument("profile_a", type=parse_profile)
+    compare.add_argument("profile_b", type=parse_profile)
+    compare.add_argument("-n", type=parse_count, default=100_000, help="trajectoires par profil")
+    compare.add_argument("--method", choices=["independent", "crn", "antithetic", "sobol"], default="crn")
+    compare.add_argument("--replicates", type=int, default=16, help="réplications brouillées (sobol)")
+    compare.add_argument("--months", type=parse_months, default=HORIZON)
+    compare.add_argument("--seed", type=int)
+    compare.set_defaults(handler=cmd_compare)
+
+    scenarios = commands.add_parser("scenarios", help="profils comparés côte à côte en un seul appel vectorisé")
+    scenarios.add_argument("profiles", nargs="+", type=parse_profile, help="profil actuel puis scénarios")
+    scenarios.add_argument("-n", type=parse_count, help="trajectoires simulées par profil, en plus du calcul exact")
+    scenarios.add_argument("--months", type=parse_months, default=HORIZON)
+    scenarios.add_argument("--seed", type=int)
+    scenarios.set_defaults(handler=cmd_scenarios)
+
+    rare = commands.add_parser("rare", help="probabilité d'une issue rare par échantillonnage préférentiel")
+    rare.add_argument("profile", type=parse_profile)
+    rare.add_argument("--outcome", choices=["échec", "succès"], default="échec")
+    rare.add_argument("-n", type=parse_count, default=100_000, help="trajectoires pondérées")
+    rare.add_argument("--pilot", type=int, default=10_000, help="trajectoires par paquet pilote (entropie croisée)")
+    rare.add_argument("--months", type=parse_months, default=HORIZON)
+    rare.add_argument("--seed", type=int)
+    rare.set_defaults(handler=cmd_rare)
+
+    runs = commands.add_parser("runs", help="interroge le registre persistant des simulations")
+    runs.add_argument("conditions", nargs="*", type=parse_condition, help="ex. invisibilisation>=8 pressure<3")
+    runs.add_argument("--kind", help="trajectory, batch:<n>, exact, fan:<n>, plan:<cible>, levers:<n>, inertia, parallel...")
+    runs.add_argument("--limit", type=int, default=1000)
+    runs.add_argument("--all-versions", action="store_true", help="inclut les versions antérieures du moteur")
+    runs.add_argument("--path", help="fichier SQLite (par défaut INERTIE_STORE ou runs.sqlite)")
+    runs.set_defaults(handler=cmd_runs)
+
+    loadtest = commands.add_parser("loadtest", help="sessions Streamlit simultanées sur une app")
+    loadtest.add_argument("app", help="chemin d'une app-v*.py")
+    loadtest.add_argument("--sessions", type=lambda text: [int(v) for v in text.split(",")], default=[1, 2, 4, 8],
+                          help="niveaux de concurrence, ex. 1,2,4,8")
+    loadtest.add_argument("--steps", type=int, default=5, help="clics par session")
+    loadtest.add_argument("--mode", choices=["thread", "process"], default="thread")
+    loadtest.add_argument("--seed", type=int)
+    loadtest.set_defaults(handler=cmd_loadtest)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    result = args.handler(args)
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    # Code de sortie non nul si le banc détecte une régression
+    return 1 if isinstance(result, dict) and result.get("regressions") else 0
@@ -0,0 +1,38 @@
+# Codes compacts des événements mensuels (uint8) : la trajectoire se stocke en quelques octets
+# et le récit « Mois k : ... » n'est reconstruit qu'au moment de l'affichage.
+
+AUCUN = 0  # mois non simulé (trajectoire déjà absorbée)
+INERTIE = 1
+REPORT = 2
+STATU_QUO = 3
+ACTION_INVISIBLE = 4
+AUTO_EFFACEMENT = 5
+PRESSION = 6
+MICRO_ACTION = 7
+
+# Bit ajouté au code d'une action suivie d'un doute (aversion à la perte)
+DOUTE = 0x80
+
+LABELS = {
+    INERTIE: "vision négative → inertie.",
+    REPORT: "report de la décision.",
+    STATU_QUO: "réduction des options → statu quo.",
+    ACTION_INVISIBLE: "action invisible → sentiment d’inutilité.",
+    AUTO_EFFACEMENT: "auto-effacement → renoncement silencieux.",
+    PRESSION: "pression extérieure → tentative d’action.",
+    MICRO_ACTION: "réflexion / micro-action.",
+}
+DOUTE_LABEL = " → doute post-action."
+
+
+def render_event(month, code):
+    code = int(code)
+    line = f"Mois {month} : " + LABELS[code & ~DOUTE]
+    if code & DOUTE:
+        line += DOUTE_LABEL
+    return line
+
+
+def render_story(events):
+    # events : codes d'une trajectoire ; les mois non simulés sont ignorés
+    return [render_event(month, code) for month, code in enumerate(events, start=1) if code != AUCUN]
@@ -0,0 +1,43 @@
+# Éventail de progression : médiane et bandes 5-25-75-95 % de la progression, mois par mois, sur
+# un grand nombre de trajectoires. La progression est un petit entier borné : des histogrammes
+# mensuels (months × valeurs) suffisent et donnent des quantiles exacts, sans jamais garder la
+# matrice des trajectoires. Mémoire O(months × valeurs), même pour 1e8 trajectoires.
+
+import numpy as np
+
+from .batch import HORIZON, progress_values, simulate_batch
+from .rng import make_rng
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+BATCH_SIZE = 1 << 20
+
+
+def histogram_quantiles(histogram, values, quantiles=QUANTILES):
+    # histogram : (..., months, valeurs) ; renvoie (..., quantiles, months), la plus petite valeur
+    # dont la fréquence cumulée atteint q
+    cumulative = np.cumsum(histogram, axis=-1)
+    thresholds = np.asarray(quantiles)[:, None] * cumulative[..., None, :, -1]
+    index = (cumulative[..., None, :, :] < thresholds[..., None]).sum(axis=-1)
+    return values[np.minimum(index, len(values) - 1)]
+
+
+def fan_stream(params, n, rng=None, months=HORIZON, batch_size=BATCH_SIZE, quantiles=QUANTILES):
+    # Un instantané par paquet : l'éventail se précise au fil des trajectoires
+    rng = make_rng(rng)
+    values = progress_values(months)
+    histogram = np.zeros((months, len(values)), dtype=np.int64)
+    done = 0
+    while done < n:
+        size = min(batch_size, n - done)
+        histogram += simulate_batch(params, size, rng=rng, months=months, keep_progress=False,
+                                    progress_histogram=True)["histogram"]
+        done += size
+        yield {"n": done, "quantiles": histogram_quantiles(histogram, values, quantiles)}
+
+
+def fan_quantiles(params, n, rng=None, months=HORIZON):
+    if n < 1:
+        raise ValueError(f"il faut au moins une trajectoire : {n}")
+    for snapshot in fan_stream(params, n, rng, months):
+        pass
+    return snapshot["quantiles"]
@@ -0,0 +1,125 @@
+# Table précalculée des probabilités exactes sur toute la grille des curseurs (entiers de 0 à 10).
+# Construite hors ligne (python -m inertie build-table), puis ouverte en np.memmap :
+# chaque mouvement de curseur devient une lecture O(1).
+#
+# Seuls six curseurs interviennent dans simulate() : l'évitement et la visibilité des coulisses
+# ne jouent que sur le score d'inertie, qui reste calculé directement (quelques opérations).
+# La table est donc indexée sur 11^6 profils au lieu de 11^8.
+#
+# La version du moteur est inscrite dans le nom du fichier par défaut et dans une ligne finale de
+# la table : une table construite par un autre moteur est ignorée (retour au calcul exact).
+
+import os
+import threading
+
+import numpy as np
+
+from .batch import ENGINE_VERSION, OUTCOMES, PARAM_NAMES
+from .markov import exact_distribution
+
+RADIX = 11
+# Position dans PARAM_NAMES des curseurs utilisés par simulate(), du chiffre de poids faible au plus fort
+SIM_AXES = (0, 1, 2, 3, 5, 6)
+GRID_SIZE = RADIX ** len(SIM_AXES)
+
+# Probabilités quantifiées sur 16 bits : pas de 1/65535
+SCALE = np.iinfo(np.uint16).max
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            f"outcome_table-v{ENGINE_VERSION}.npy")
+
+# Tables ouvertes, par chemin ; une table absente ou périmée n'est pas mémorisée
+_TABLES = {}
+_TABLES_LOCK = threading.Lock()
+
+
+def grid_index(params):
+    # Encodage mixte (base 11) des curseurs utiles ; params : (..., 8) entiers
+    params = np.asarray(params, dtype=np.int64)
+    index = np.zeros(params.shape[:-1], dtype=np.int64)
+    for axis in reversed(SIM_AXES):
+        index = index * RADIX + params[..., axis]
+    return index
+
+
+def grid_params(index):
+    # Inverse de grid_index ; les curseurs sans effet sur simulate() sont mis à 0
+    index = np.asarray(index, dtype=np.int64)
+    params = np.zeros(index.shape + (len(PARAM_NAMES),), dtype=np.int64)
+    for axis in SIM_AXES:
+        index, params[..., axis] = np.divmod(index, RADIX)
+    return params
+
+
+def build_table(path=DEFAULT_PATH, chunk=100_000):
+    # Colonnes dans l'ordre de OUTCOMES ; ligne supplémentaire en fin de table : version du moteur
+    with _TABLES_LOCK:
+        _TABLES.pop(path, None)
+    table = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint16, shape=(GRID_SIZE + 1, len(OUTCOMES)))
+    table[GRID_SIZE] = (ENGINE_VERSION, 0, 0)
+    for start in range(0, GRID_SIZE, chunk):
+        stop = min(start + chunk, GRID_SIZE)
+        probabilities = exact_distribution(grid_params(np.arange(start, stop)), keep_progress=False)["probabilities"]
+        for column, name in enumerate(OUTCOMES):
+            table[start:stop, column] = np.rint(probabilities[name] * SCALE)
+    table.flush()
+    return path
+
+
+class OutcomeTable:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.table = np.load(path, mmap_mode="r")
+
+    def is_current(self):
+        # Table complète, construite par la version courante du moteur
+        return self.table.shape == (GRID_SIZE + 1, len(OUTCOMES)) and int(self.table[GRID_SIZE, 0]) == ENGINE_VERSION
+
+    def lookup(self, params):
+        # params : profil (8,) ou lot (..., 8) ; renvoie les probabilités par issue
+        rows = self.table[grid_index(params)] / SCALE
+        if rows.ndim == 1:
+            return {name: float(rows[column]) for column, name in enumerate(OUTCOMES)}
+        return {name: rows[..., column] for column, name in enumerate(OUTCOMES)}
+
+
+def open_table(path=DEFAULT_PATH):
+    # Une seule ouverture par processus ; None si la table n'a pas été construite ou vient d'un
+    # autre moteur. Ce cas n'est pas mémorisé : une table construite ensuite est prise en compte.
+    with _TABLES_LOCK:
+        table = _TABLES.get(path)
+    if table is not None:
+        return table
+    if not os.path.exists(path):
+        return None
+    table = OutcomeTable(path)
+    if not table.is_current():
+        return None
+    with _TABLES_LOCK:
+        _TABLES[path] = table
+    return table
+
+
+def neighbours(params):
+    # Profils voisins : chaque curseur déplacé de ±1, dans les bornes 0-10
+    params = np.asarray(params, dtype=np.int64)
+    moves = []
+    rows = []
+    for axis, name in enumerate(PARAM_NAMES):
+        for delta in (-1, 1):
+            value = params[axis] + delta
+            if 0 <= value < RADIX:
+                row = params.copy()
+                row[axis] = value
+                moves.append((name, delta))
+                rows.append(row)
+    return moves, np.array(rows)
+
+
+def outcome_probabilities(params, path=DEFAULT_PATH):
+    # Lecture dans la table si elle existe, sinon calcul exact
+    table = open_table(path)
+    if table is not None:
+        return table.lookup(params)
+    return exact_distribution(params, keep_progress=False)["probabilities"]
+
@@ -0,0 +1,44 @@
+# Recalcul incrémental : chaque artefact dérivé (scores, posture, graphiques, récit...) est un nœud
+# qui déclare ses entrées, sources (profil, graine...) ou autres nœuds. Sa signature est construite
+# récursivement à partir des valeurs des sources dont il dépend ; le résultat est épinglé pour la
+# session sous cette signature (inertie.session) et n'est recalculé que si l'une de ces sources a
+# changé. Un nœud qui ne dépend que du profil survit ainsi à un changement de graine, etc.
+
+from . import metrics
+from .session import SESSIONS
+
+
+class Pipeline:
+    def __init__(self, sessions=SESSIONS):
+        self.sessions = sessions
+        # nom -> (entrées, fonction des valeurs des entrées)
+        self._nodes = {}
+
+    def node(self, name, *inputs):
+        # Décorateur : la fonction reçoit les valeurs de ses entrées, dans l'ordre déclaré
+        def decorator(function):
+            self._nodes[name] = (inputs, function)
+            return function
+        return decorator
+
+    def signature(self, name, sources):
+        # Les sources sont identifiées par leur valeur (hachable), les nœuds par leur nom et leurs entrées
+        if name in sources:
+            return sources[name]
+        if name not in self._nodes:
+            raise KeyError(f"nœud inconnu : {name}")
+        inputs, _ = self._nodes[name]
+        return (name,) + tuple(self.signature(item, sources) for item in inputs)
+
+    def evaluate(self, state, name, sources):
+        if name in sources:
+            return sources[name]
+        inputs, function = self._nodes[name]
+
+        def compute():
+            values = [self.evaluate(state, item, sources) for item in inputs]
+            metrics.inc("node_recomputes")
+            with metrics.timer(f"node_{name}"):
+                return function(*values)
+
+        return self.sessions.result(state, self.signature(name, sources), compute)
@@ -0,0 +1,124 @@
+# Générateur de charge local : N sessions headless simultanées (AppTest de Streamlit) qui
+# rejouent un parcours réaliste — bouger des curseurs, cliquer « Lancer la simulation », lire
+# le résultat — sur une app-v*.py. Latences des reruns (p50/p95/p99), débit et mémoire par
+# session, pour chaque niveau de concurrence. Tout tourne hors ligne sur une seule machine.
+#
+# Mode « thread » : les sessions partagent le processus, comme dans un serveur Streamlit
+# (caches, état global de random/pyplot, GIL). Mode « process » : un processus par session,
+# pour isoler la mémoire et contourner le GIL.
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from .metrics import state_size
+from .rng import make_rng
+
+LEVELS = (1, 2, 4, 8)
+STEPS = 5
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_bytes():
+    # Mémoire résidente actuelle du processus (Linux)
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE
+
+
+def _move_sliders(app, rng, moves=2):
+    # Quelques curseurs pris au hasard, valeur tirée sur leur pas
+    sliders = list(app.slider)
+    for index in rng.choice(len(sliders), size=min(moves, len(sliders)), replace=False):
+        slider = sliders[index]
+        ticks = int(round((slider.max - slider.min) / slider.step))
+        slider.set_value(type(slider.value)(slider.min + rng.integers(0, ticks + 1) * slider.step))
+
+
+def session_flow(path, steps=STEPS, seed=None, start_barrier=None):
+    # Un utilisateur : premier affichage, puis `steps` fois curseurs + clic + lecture du résultat
+    from streamlit.testing.v1 import AppTest
+
+    rng = make_rng(seed)
+    app = AppTest.from_file(path, default_timeout=300)
+    if start_barrier is not None:
+        start_barrier.wait()
+    latencies = []
+    start = time.perf_counter()
+    app.run()
+    latencies.append(time.perf_counter() - start)
+    for _ in range(steps):
+        _move_sliders(app, rng)
+        # app-v2 n'a pas de bouton : le déplacement du curseur suffit à relancer le calcul
+        if len(app.button):
+            app.button[0].click()
+        start = time.perf_counter()
+        app.run()
+        latencies.append(time.perf_counter() - start)
+        if app.exception:
+            raise RuntimeError(f"{os.path.basename(path)} : {app.exception[0].message}")
+        # Lecture du résultat affiché, comme le ferait l'utilisateur
+        _ = [element.value for element in app.markdown]
+    return {"latencies": latencies, "state_bytes": state_size(app.session_state), "app": app}
+
+
+def _process_session(path, steps, seed):
+    # Exécuté dans un processus dédié : la mémoire mesurée est celle de cette seule session,
+    # Streamlit déjà importé
+    import streamlit.testing.v1  # noqa: F401
+
+    before = rss_bytes()
+    result = session_flow(path, steps, seed)
+    result.pop("app")
+    result["memory_bytes"] = rss_bytes() - before
+    return result
+
+
+def run_level(path, sessions, steps=STEPS, mode="thread", seed=None):
+    seeds = np.random.SeedSequence(seed).generate_state(sessions).tolist()
+    start = time.perf_counter()
+    if mode == "process":
+        with ProcessPoolExecutor(max_workers=sessions) as pool:
+            results = list(pool.map(_process_session, [path] * sessions, [steps] * sessions, seeds))
+        memory = [r["memory_bytes"] for r in results]
+    else:
+        # Les sessions démarrent ensemble ; elles restent vivantes jusqu'à la mesure mémoire
+        barrier = threading.Barrier(sessions)
+        before = rss_bytes()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            results = list(pool.map(lambda s: session_flow(path, steps, s, barrier), seeds))
+        memory = [(rss_bytes() - before) / sessions] * sessions
+        for r in results:
+            r.pop("app")
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate([r["latencies"] for r in results])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(latencies.max()),
+        "throughput": len(latencies) / elapsed,
+        "memory_per_session_bytes": float(np.mean(memory)),
+        "state_bytes_per_session": float(np.mean([r["state_bytes"] for r in results])),
+        "rss_bytes": rss_bytes(),
+    }
+
+
+def load_test(path, levels=LEVELS, steps=STEPS, mode="thread", seed=None):
+    # AppTest résout les chemins relatifs depuis le module appelant, pas depuis le répertoire courant
+    path = os.path.abspath(path)
+    # Une session de chauffe d'abord : imports et caches de processus ne faussent pas le premier niveau
+    session_flow(path, 1, seed)
+    return {
+        "app": os.path.basename(path),
+        "mode": mode,
+        "steps": steps,
+        "cpu_count": os.cpu_count(),
+        "levels": [run_level(path, n, steps, mode, seed) for n in levels],
+    }
@@ -0,0 +1,229 @@
+# Distribution exacte des résultats : l'état de simulate() se résume à (mois, progression),
+# c'est donc une petite chaîne de Markov qu'on propage mois par mois, sans échantillonnage.
+
+from collections import Counter
+
+import numpy as np
+
+from .batch import (
+    HORIZON,
+    OUTCOMES,
+    SEUIL_ECHEC,
+    SEUIL_SUCCES,
+    event_probabilities,
+    progress_values,
+)
+from .rng import make_rng
+
+# Couches de l'état : en cours, absorbé en succès, absorbé en échec.
+# Les absorbés gardent leur valeur de progression, comme les trajectoires figées du mode batch.
+EN_COURS, ABSORBE_SUCCES, ABSORBE_ECHEC = 0, 1, 2
+
+
+def event_weights(params):
+    # Probabilités mensuelles : immobilité, recul (action invisible) et action de +0 à +3
+    pe, pr, ps, pi, pa, pp, pl = np.moveaxis(event_probabilities(params), -1, 0)
+    q = (1 - pe) * (1 - pr) * (1 - ps)
+    invisible = q * pi
+    act = q * (1 - pi) * (1 - pa)
+    return {
+        "stay": 1 - invisible - act,
+        "invisible": invisible,
+        "action": np.stack([
+            act * (1 - pp) * pl,        # +1 puis doute
+            act * (1 - pp) * (1 - pl),  # +1
+            act * pp * pl,              # +3 puis doute
+            act * pp * (1 - pl),        # +3
+        ], axis=-1),
+    }
+
+
+def _step(dist, weights, values):
+    # dist : (..., 3, NV) ; un mois de la cascade appliqué à la couche « en cours »
+    pending = dist[..., EN_COURS, :]
+    stay = weights["stay"][..., None]
+    invisible = weights["invisible"][..., None]
+    action = weights["action"]
+
+    moved = stay * pending
+    # Action invisible : recul d'un cran, sans vérification du résultat
+    moved[..., :-1] += invisible * pending[..., 1:]
+    # Plancher de la grille : jamais atteint dans l'horizon, gardé pour que le noyau reste stochastique
+    moved[..., 0] += invisible[..., 0] * pending[..., 0]
+
+    # Action : progression de 0 à +3, puis vérification des seuils
+    landing = np.zeros_like(pending)
+    size = pending.shape[-1]
+    for delta in range(4):
+        landing[..., delta:] += action[..., delta, None] * pending[..., :size - delta]
+        if delta:
+            landing[..., -1] += action[..., delta] * pending[..., size - delta:].sum(axis=-1)
+
+    success = values >= SEUIL_SUCCES
+    failure = values <= SEUIL_ECHEC
+    out = dist.copy()
+    out[..., EN_COURS, :] = moved + np.where(success | failure, 0.0, landing)
+    out[..., ABSORBE_SUCCES, :] += np.where(success, landing, 0.0)
+    out[..., ABSORBE_ECHEC, :] += np.where(failure, landing, 0.0)
+    return out
+
+
+def initial_state(shape=(), months=HORIZON):
+    values = progress_values(months)
+    dist = np.zeros(shape + (3, len(values)))
+    dist[..., EN_COURS, np.searchsorted(values, 0)] = 1.0
+    return dist
+
+
+def transition_kernel(params, months=HORIZON):
+    # Matrice (3·NV, 3·NV) d'un mois, construite en appliquant _step à chaque état de base
+    values = progress_values(months)
+    size = 3 * len(values)
+    weights = event_weights(params)
+    basis = np.eye(size).reshape(size, 3, len(values))
+    weights = {key: np.broadcast_to(w, (size,) + w.shape) for key, w in weights.items()}
+    return _step(basis, weights, values).reshape(size, size)
+
+
+def exact_distribution(params, months=HORIZON, keep_progress=True):
+    # params : profil (8,) ou lot de profils (..., 8)
+    params = np.asarray(params, dtype=np.float64)
+    values = progress_values(months)
+    weights = event_weights(params)
+    dist = initial_state(params.shape[:-1], months)
+
+    progress = []
+    absorbed = []
+    for _ in range(months):
+        previous = dist[..., 1:, :].sum(axis=-1) if keep_progress else None
+        dist = _step(dist, weights, values)
+        if keep_progress:
+            progress.append(dist.sum(axis=-2))
+            absorbed.append(dist[..., 1:, :].sum(axis=-1) - previous)
+
+    totals = dist.sum(axis=-1)
+    probabilities = {
+        "report indéfini": totals[..., EN_COURS],
+        "succès": totals[..., ABSORBE_SUCCES],
+        "échec": totals[..., ABSORBE_ECHEC],
+    }
+    if params.ndim == 1:
+        probabilities = {name: float(p) for name, p in probabilities.items()}
+    return {
+        "probabilities": probabilities,
+        "values": values,
+        # Distribution de la progression à la fin de chaque mois : (..., mois, NV)
+        "progress": np.stack(progress, axis=-2) if keep_progress else None,
+        # Masse absorbée chaque mois en succès / échec : (..., mois, 2)
+        "absorbed": np.stack(absorbed, axis=-2) if keep_progress else None,
+    }
+
+
+# Horizon long : la progression négative n'est pas bornée (les actions invisibles reculent sans
+# vérification du résultat), mais sous SEUIL_ECHEC - 3 toute action, même sous pression (+3),
+# mène à l'échec. Ces valeurs se comportent toutes pareil et sont regroupées en un plancher :
+# le regroupement est exact pour les issues. Reste une chaîne à 16 états transitoires + 2 absorbants,
+# invariante dans le temps, qu'on élève à la puissance T par carrés successifs.
+PLANCHER = SEUIL_ECHEC - 3
+LONG_VALUES = np.arange(PLANCHER, SEUIL_SUCCES)
+N_TRANSIENT = len(LONG_VALUES)
+LONG_SUCCES, LONG_ECHEC = N_TRANSIENT, N_TRANSIENT + 1
+LONG_START = int(np.searchsorted(LONG_VALUES, 0))
+
+
+def _long_basis():
+    # Matrices constantes (6, 18, 18) : immobilité, recul, actions de +0 à +3 ; le noyau d'un
+    # profil en est la combinaison linéaire par ses poids mensuels
+    size = N_TRANSIENT + 2
+    basis = np.zeros((6, size, size))
+    for i, value in enumerate(LONG_VALUES):
+        basis[0, i, i] = 1.0
+        basis[1, i, max(i - 1, 0)] = 1.0
+        for delta in range(4):
+            landing = value + delta
+            if landing >= SEUIL_SUCCES:
+                basis[2 + delta, i, LONG_SUCCES] = 1.0
+            elif landing <= SEUIL_ECHEC:
+                basis[2 + delta, i, LONG_ECHEC] = 1.0
+            else:
+                basis[2 + delta, i, i + delta] = 1.0
+    return basis
+
+
+_LONG_BASIS = _long_basis()
+_LONG_ABSORBING = np.zeros((N_TRANSIENT + 2,) * 2)
+_LONG_ABSORBING[LONG_SUCCES, LONG_SUCCES] = _LONG_ABSORBING[LONG_ECHEC, LONG_ECHEC] = 1.0
+
+
+def long_run_kernel(params):
+    # Matrice de transition mensuelle (..., 18, 18) sur la progression bornée
+    weights = event_weights(params)
+    coefficients = np.concatenate([weights["stay"][..., None], weights["invisible"][..., None],
+                                   weights["action"]], axis=-1)
+    return np.einsum("...k,kij->...ij", coefficients, _LONG_BASIS) + _LONG_ABSORBING
+
+
+def _long_probabilities(row, scalar):
+    probabilities = {
+        "report indéfini": row[..., :N_TRANSIENT].sum(axis=-1),
+        "succès": row[..., LONG_SUCCES],
+        "échec": row[..., LONG_ECHEC],
+    }
+    if scalar:
+        probabilities = {name: float(p) for name, p in probabilities.items()}
+    return probabilities
+
+
+def long_horizon_distribution(params, months):
+    # Issues au mois `months` par exponentiation rapide : O(log months) produits de matrices 18×18
+    months = int(months)
+    if months < 0:
+        raise ValueError(f"horizon négatif : {months} mois")
+    params = np.asarray(params, dtype=np.float64)
+    kernel = long_run_kernel(params)
+    power = np.broadcast_to(np.eye(N_TRANSIENT + 2), kernel.shape).copy()
+    while months:
+        if months & 1:
+            power = power @ kernel
+        kernel = kernel @ kernel
+        months >>= 1
+    return _long_probabilities(power[..., LONG_START, :], params.ndim == 1)
+
+
+def absorption_probabilities(params):
+    # Limite T → ∞ : B = (I - Q)⁻¹ R pour l'état de départ, et durée moyenne avant décision.
+    # Une action reste toujours possible, donc la décision finit par tomber (report indéfini = 0).
+    params = np.asarray(params, dtype=np.float64)
+    kernel = long_run_kernel(params)
+    q = kernel[..., :N_TRANSIENT, :N_TRANSIENT]
+    r = kernel[..., :N_TRANSIENT, N_TRANSIENT:]
+    start = np.zeros(N_TRANSIENT)
+    start[LONG_START] = 1.0
+    # Ligne de départ de la matrice fondamentale : (I - Q)ᵀ y = e_départ
+    fundamental = np.linalg.solve(np.swapaxes(np.eye(N_TRANSIENT) - q, -1, -2),
+                                  np.broadcast_to(start, q.shape[:-1])[..., None])[..., 0]
+    absorbed = np.einsum("...i,...ij->...j", fundamental, r)
+    row = np.concatenate([np.zeros(q.shape[:-2] + (N_TRANSIENT,)), absorbed], axis=-1)
+    result = _long_probabilities(row, params.ndim == 1)
+    months = fundamental.sum(axis=-1)
+    result["mois_moyens"] = float(months) if params.ndim == 1 else months
+    return result
+
+
+def cross_check(agent, n=20_000, rng=None, batch=False):
+    # Compare les fréquences de agent.simulate() (ou du mode batch) aux probabilités exactes
+    # (écarts en nombre d'écarts-types)
+    rng = make_rng(rng)
+    exact = exact_distribution(agent.parameters())["probabilities"]
+    if batch:
+        codes = agent.simulate_batch(n, rng=rng, keep_progress=False)["outcome"]
+        observed = Counter(dict(zip(OUTCOMES, np.bincount(codes, minlength=len(OUTCOMES)).tolist())))
+    else:
+        observed = Counter(agent.simulate(rng=rng)[1] for _ in range(n))
+    report = {}
+    for name in OUTCOMES:
+        p = exact[name]
+        freq = observed[name] / n
+        sigma = np.sqrt(max(p * (1 - p), 1e-12) / n)
+        report[name] = {"exact": p, "observed": freq, "z": (freq - p) / sigma}
+    return report
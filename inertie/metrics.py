@@ -0,0 +1,176 @@
+# Instrumentation des étapes d'un rerun : durées, compteurs et jauges agrégés par processus
+# (donc sur toutes les sessions Streamlit servies par ce processus). Exportables en JSON ou au
+# format texte Prometheus, pour dimensionner le nombre de sessions par pod.
+
+import contextlib
+import functools
+import json
+import os
+import pickle
+import threading
+import time
+
+# Bornes (secondes) de l'histogramme des durées, façon Prometheus
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = "inertie_"
+
+
+class Registry:
+    def __init__(self):
+        self._timers = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._last_dump = 0.0
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+            timer["count"] += 1
+            timer["sum"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    timer["buckets"][i] += 1
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        # Décorateur : chaque appel alimente le chronomètre `name`
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def snapshot(self):
+        # Import différé : les caches sont lus au moment de l'export, sans dépendance à l'import
+        from .cache import RESULTS
+        from .charts import RENDERS
+        from .session import SESSIONS
+
+        with self._lock:
+            timers = {
+                name: dict(timer, buckets=list(timer["buckets"]),
+                           mean=timer["sum"] / timer["count"] if timer["count"] else 0.0)
+                for name, timer in self._timers.items()
+            }
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        return {
+            "pid": os.getpid(),
+            "timers": timers,
+            "counters": counters,
+            "gauges": gauges,
+            "caches": {"results": RESULTS.stats(), "renders": RENDERS.stats()},
+            "sessions": SESSIONS.stats(),
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        lines = [
+            f"# TYPE {PREFIX}stage_seconds histogram",
+        ]
+        for name, timer in snapshot["timers"].items():
+            for bound, count in zip(BUCKETS, timer["buckets"]):
+                lines.append(f'{PREFIX}stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'{PREFIX}stage_seconds_bucket{{stage="{name}",le="+Inf"}} {timer["count"]}')
+            lines.append(f'{PREFIX}stage_seconds_sum{{stage="{name}"}} {timer["sum"]}')
+            lines.append(f'{PREFIX}stage_seconds_count{{stage="{name}"}} {timer["count"]}')
+        for name, value in snapshot["counters"].items():
+            lines.append(f"# TYPE {PREFIX}{name}_total counter")
+            lines.append(f"{PREFIX}{name}_total {value}")
+        for name, value in snapshot["gauges"].items():
+            lines.append(f"# TYPE {PREFIX}{name} gauge")
+            lines.append(f"{PREFIX}{name} {value}")
+        for cache_name, stats in snapshot["caches"].items():
+            for field in ("hits", "misses"):
+                lines.append(f'{PREFIX}cache_{field}_total{{cache="{cache_name}"}} {stats[field]}')
+            lines.append(f'{PREFIX}cache_entries{{cache="{cache_name}"}} {stats["size"]}')
+        sessions = snapshot["sessions"]
+        lines.append(f"# TYPE {PREFIX}sessions gauge")
+        lines.append(f"{PREFIX}sessions {sessions['sessions']}")
+        lines.append(f"{PREFIX}session_pins_bytes {sessions['bytes']}")
+        for field in ("hits", "reloads", "evictions"):
+            lines.append(f"{PREFIX}session_pin_{field}_total {sessions[field]}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        # Format selon l'extension : .prom / .txt en texte Prometheus, sinon JSON ; écriture atomique
+        text = self.to_prometheus() if os.path.splitext(path)[1] in (".prom", ".txt") else self.to_json()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as out:
+            out.write(text)
+        os.replace(tmp, path)
+        return path
+
+    def dump_every(self, path, interval):
+        # Écriture au plus une fois par intervalle, appelable à chaque rerun
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_dump < interval:
+                return False
+            self._last_dump = now
+        self.dump(path)
+        return True
+
+
+# Instance unique par processus
+REGISTRY = Registry()
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+inc = REGISTRY.inc
+set_gauge = REGISTRY.set_gauge
+
+# Export automatique : chemin du fichier (JSON ou .prom) et intervalle minimal entre deux écritures
+DUMP_PATH = os.environ.get("INERTIE_METRICS_FILE")
+DUMP_INTERVAL = float(os.environ.get("INERTIE_METRICS_INTERVAL", "10"))
+
+
+def state_size(state):
+    # Taille sérialisée (octets) de l'état de session ; les valeurs non sérialisables sont ignorées
+    size = 0
+    for key in list(state.keys()):
+        try:
+            size += len(pickle.dumps(state[key], protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            continue
+    return size
+
+
+def end_run(start, state):
+    # Fin de rerun : durée totale, taille de l'état de session, export éventuel
+    observe("script_run", time.perf_counter() - start)
+    inc("script_runs")
+    set_gauge("session_state_bytes", state_size(state))
+    if DUMP_PATH:
+        REGISTRY.dump_every(DUMP_PATH, DUMP_INTERVAL)
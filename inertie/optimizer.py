@@ -0,0 +1,265 @@
+# Intervention minimale : le plus petit changement pondéré des curseurs qui fait passer P(succès)
+# au-dessus d'une cible, ou le score d'inertie total sous un seuil de posture.
+#
+# Chaque curseur n'est déplacé que dans le sens qui aide (moins de procrastination, plus de
+# visibilité...), ce qui ramène la recherche à une boîte. Pour P(succès), dichotomie sur le coût
+# en écartant les candidats dominés par un échec, évaluation par paquets bornés : lecture dans la
+# table précalculée si elle existe, sinon calcul exact mémorisé sur toute la grille du processus,
+# si bien que les profils voisins sont quasi gratuits. Pour le score, linéaire, un sac à dos
+# borné donne directement la solution.
+
+import threading
+
+import numpy as np
+
+from .batch import PARAM_NAMES
+from .grid import GRID_SIZE, SIM_AXES, grid_index, open_table
+from .markov import exact_distribution
+from .scoring import inertia_scores
+
+# Sens favorable de chaque curseur (+1 : augmenter, -1 : diminuer)
+DIRECTIONS = {
+    "procrastination": -1,
+    "pessimism": -1,
+    "loss_aversion": -1,
+    "scarcity": -1,
+    "avoidance": -1,
+    "pressure": 1,
+    "invisibilisation": -1,
+    "visibilite_coulisses": 1,
+}
+
+# Candidats évalués par appel au moteur exact (mémoire bornée)
+CHUNK = 4096
+
+# Gain minimal d'un levier : un dixième de point de probabilité, ou un point de score
+MIN_GAIN = {"succès": 1e-3, "score": 1.0}
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+_memo = None
+_memo_lock = threading.Lock()
+
+
+def success_probability(profiles):
+    # P(succès) pour un lot (m, 8) : table précalculée si présente, sinon calcul exact mémorisé
+    global _memo
+    profiles = np.asarray(profiles, dtype=np.int64)
+    index = grid_index(profiles)
+    table = open_table()
+    if table is not None:
+        return table.lookup(profiles)["succès"]
+    with _memo_lock:
+        if _memo is None:
+            _memo = np.full(GRID_SIZE, np.nan, dtype=np.float32)
+    values = _memo[index]
+    missing = np.isnan(values)
+    if missing.any():
+        computed = exact_distribution(profiles[missing], keep_progress=False)["probabilities"]["succès"]
+        _memo[index[missing]] = computed
+        values[missing] = computed
+    return values.astype(np.float64)
+
+
+def _result(params, profile, cost, value):
+    return {
+        "params": tuple(int(v) for v in profile),
+        "cost": float(cost),
+        "value": float(value),
+        "changes": [(name, int(params[i]), int(profile[i]))
+                    for i, name in enumerate(PARAM_NAMES) if profile[i] != params[i]],
+    }
+
+
+def _minimal_success_change(params, target_success, weights, max_evaluations=None):
+    # Boîte des déplacements favorables des six curseurs utiles (0-10), coût pondéré par case.
+    # P(succès) croît dans chaque sens favorable : si un candidat échoue, tous ceux qu'il domine
+    # (chaque curseur déplacé au plus autant) échouent aussi et ne sont pas évalués. Dichotomie sur
+    # le coût : un coût c est atteignable si l'un des candidats maximaux de coût ≤ c réussit ; puis
+    # le palier du coût minimal est évalué en entier (probabilité la plus haute à coût égal).
+    axes = list(SIM_AXES)
+    signs = np.array([DIRECTIONS[PARAM_NAMES[axis]] for axis in axes])
+    rooms = [0 if weights[axis] is None else (10 - params[axis] if sign > 0 else params[axis])
+             for axis, sign in zip(axes, signs)]
+    unit_costs = [weights[axis] or 0.0 for axis in axes]
+    shape = tuple(room + 1 for room in rooms)
+    steps = np.ix_(*[np.arange(size) for size in shape])
+    costs = sum(step * unit for step, unit in zip(steps, unit_costs))
+    # failed : cases dominées par un échec connu ; values : P(succès) des cases évaluées
+    failed = np.zeros(shape, dtype=bool)
+    values = np.full(shape, np.nan)
+    evaluations = 0
+
+    def evaluate(cells, stop_on_success):
+        # Évaluation par paquets d'au plus CHUNK cases. Les cases d'un même appel ne se dominent pas
+        # entre elles (maximales, ou de même coût) : les échecs ne sont propagés qu'une fois par appel.
+        nonlocal evaluations
+        misses = []
+        found = False
+        for start in range(0, len(cells), CHUNK):
+            batch = cells[start:start + CHUNK]
+            if max_evaluations is not None and evaluations + len(batch) > max_evaluations:
+                raise _BudgetExceeded
+            evaluations += len(batch)
+            profiles = np.repeat(params[None], len(batch), axis=0)
+            profiles[:, axes] += np.stack(np.unravel_index(batch, shape), axis=-1) * signs
+            values.flat[batch] = success_probability(profiles)
+            misses.append(batch[values.flat[batch] < target_success])
+            if stop_on_success and len(misses[-1]) < len(batch):
+                found = True
+                break
+        if misses:
+            # Un échec s'étend à tout ce qu'il domine : OU cumulé en sens inverse sur chaque axe
+            failed.flat[np.concatenate(misses)] = True
+            for axis in range(len(shape)):
+                failed[...] = np.flip(np.logical_or.accumulate(np.flip(failed, axis), axis=axis), axis)
+        return found
+
+    def reachable(cost):
+        # Cases maximales de coût ≤ cost : aucun curseur ne peut encore avancer d'un cran
+        maximal = costs <= cost
+        for axis, (step, unit) in enumerate(zip(steps, unit_costs)):
+            maximal &= (step == rooms[axis]) | (costs + unit > cost)
+        if (values[maximal] >= target_success).any():
+            return True
+        return evaluate(np.flatnonzero(maximal & np.isnan(values) & ~failed), stop_on_success=True)
+
+    try:
+        low, high = -np.inf, costs.max()
+        if not reachable(high):
+            return None
+        while True:
+            # Coûts encore possibles pour le minimum, dans ]low, high[ : on sonde leur médiane
+            between = costs[(costs > low) & (costs < high)]
+            if not len(between):
+                break
+            middle = np.partition(between, len(between) // 2)[len(between) // 2]
+            if reachable(middle):
+                high = middle
+            else:
+                low = middle
+        tier = costs == high
+        evaluate(np.flatnonzero(tier & np.isnan(values) & ~failed), stop_on_success=False)
+    except _BudgetExceeded:
+        return None
+    tier = np.flatnonzero(tier & (values >= target_success))
+    best = tier[np.argmax(values.flat[tier])]
+    profile = params.copy()
+    profile[axes] += np.array(np.unravel_index(best, shape)) * signs
+    return _result(params, profile, high, values.flat[best])
+
+
+# Baisse du score brut par cran favorable, en unités de 2,5 points
+SCORE_UNITS = {
+    "procrastination": 1,
+    "pessimism": 1,
+    "loss_aversion": 1,
+    "avoidance": 1,
+    "scarcity": 2,
+    "pressure": 2,
+    "invisibilisation": 4,
+}
+
+
+def _minimal_score_change(params, max_score, weights):
+    # Le score est linéaire par morceaux : pour chaque cran de visibilité, un petit sac à dos borné
+    # donne le coût minimal pour baisser le score brut d'au moins la quantité requise.
+    axes = [PARAM_NAMES.index(name) for name in SCORE_UNITS]
+    units = [SCORE_UNITS[PARAM_NAMES[axis]] for axis in axes]
+    rooms = [0 if weights[axis] is None else
+             (10 - params[axis] if DIRECTIONS[PARAM_NAMES[axis]] > 0 else params[axis]) for axis in axes]
+    max_units = sum(u * r for u, r in zip(units, rooms))
+
+    # layers[k][u] : coût minimal pour une baisse de u unités avec les k premiers curseurs
+    layers = [np.full(max_units + 1, np.inf)]
+    layers[0][0] = 0.0
+    for unit, room, axis in zip(units, rooms, axes):
+        previous = layers[-1]
+        layer = previous.copy()
+        for steps in range(1, room + 1):
+            shift = steps * unit
+            layer[shift:] = np.minimum(layer[shift:], previous[:-shift] + steps * weights[axis])
+        layers.append(layer)
+
+    visibility = PARAM_NAMES.index("visibilite_coulisses")
+    brut_units = int(round(inertia_scores(params)["total_brut"] / 2.5))
+    best = None
+    room_v = 0 if weights[visibility] is None else 10 - params[visibility]
+    for v in range(room_v + 1):
+        amplificateur = 1 + (10 - (params[visibility] + v)) * 0.05
+        remaining = np.arange(brut_units + 1)
+        allowed = np.flatnonzero(remaining * 2.5 * amplificateur < max_score)
+        if not len(allowed):
+            continue
+        need = brut_units - allowed.max()
+        if need > max_units:
+            continue
+        costs = layers[-1][max(need, 0):] + v * (weights[visibility] or 0)
+        cost = costs.min()
+        # À coût égal, la plus forte baisse
+        reduction = max(need, 0) + int(np.flatnonzero(costs == cost).max())
+        score = (brut_units - reduction) * 2.5 * amplificateur
+        if np.isfinite(cost) and (best is None or (cost, score) < best[:2]):
+            best = (cost, score, v, reduction)
+    if best is None:
+        return None
+
+    # Reconstruction des crans par curseur, du dernier au premier
+    cost, score, v, reduction = best
+    profile = params.copy()
+    profile[visibility] += v
+    for k in range(len(axes) - 1, -1, -1):
+        axis, unit = axes[k], units[k]
+        for steps in range(rooms[k] + 1):
+            rest = reduction - steps * unit
+            if rest >= 0 and np.isclose(layers[k][rest] + steps * (weights[axis] or 0), layers[k + 1][reduction]):
+                profile[axis] += steps * DIRECTIONS[PARAM_NAMES[axis]]
+                reduction = rest
+                break
+    return _result(params, profile, cost, inertia_scores(profile)["total"])
+
+
+def minimal_intervention(params, target_success=None, max_score=None, weights=None, max_evaluations=None):
+    # weights : coût d'un cran par curseur (dict nom -> poids, None pour un curseur non modifiable) ;
+    # max_evaluations : profils évalués au plus pour P(succès), au-delà pas de plan (None)
+    if (target_success is None) == (max_score is None):
+        raise ValueError("préciser exactement un objectif : target_success ou max_score")
+    params = np.asarray(params, dtype=np.int64)
+    weights = [1.0 if weights is None else weights.get(name, 1.0) for name in PARAM_NAMES]
+    if target_success is not None:
+        return _minimal_success_change(params, target_success, weights, max_evaluations)
+    return _minimal_score_change(params, max_score, weights)
+
+
+def ranked_levers(params, objective="succès", weights=None):
+    # Gain de l'objectif pour un cran sur chaque curseur (probabilité de succès, ou points de score
+    # d'inertie en moins), classé par gain par unité de coût ; les gains négligeables sont écartés
+    if objective not in MIN_GAIN:
+        raise ValueError(f"objectif inconnu : {objective} (succès ou score)")
+    params = np.asarray(params, dtype=np.int64)
+    weights = [1.0 if weights is None else weights.get(name, 1.0) for name in PARAM_NAMES]
+    moves = []
+    rows = []
+    for axis, name in enumerate(PARAM_NAMES):
+        value = params[axis] + DIRECTIONS[name]
+        if weights[axis] is None or not 0 <= value <= 10:
+            continue
+        row = params.copy()
+        row[axis] = value
+        moves.append((axis, name, int(value)))
+        rows.append(row)
+    if not rows:
+        return []
+    rows = np.array(rows)
+    if objective == "succès":
+        gains = success_probability(rows) - success_probability(params[None])[0]
+    else:
+        gains = inertia_scores(params)["total"] - inertia_scores(rows)["total"]
+    levers = [
+        {"param": name, "from": int(params[axis]), "to": to, "objective": objective,
+         "gain": float(gain), "efficiency": float(gain) / weights[axis]}
+        for (axis, name, to), gain in zip(moves, gains) if gain >= MIN_GAIN[objective]
+    ]
+    return sorted(levers, key=lambda lever: lever["efficiency"], reverse=True)
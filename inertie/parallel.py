@@ -0,0 +1,113 @@
+# Monte-Carlo multi-cœurs : le travail est découpé en lots de taille fixe (par profil et par tranche
+# de trajectoires), chaque lot ayant son propre sous-flux SeedSequence. Le découpage ne dépend pas
+# du nombre de processus : pour une même graine, le résultat est identique avec 1 ou 32 workers.
+# Les lots écrivent leurs comptes dans une mémoire partagée au lieu de renvoyer des tableaux picklés.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .batch import HORIZON, OUTCOMES, progress_values, simulate_batch
+from .rng import new_seed
+
+SHARD_SIZE = 1 << 20
+
+
+def _buffer_layout(n_shards, months):
+    n_values = len(progress_values(months))
+    return {
+        "counts": (n_shards, len(OUTCOMES)),
+        # Histogramme de la progression à la fin de chaque mois
+        "progress": (n_shards, months, n_values),
+        # Histogramme des durées de trajectoire (1 à months)
+        "duration": (n_shards, months + 1),
+    }
+
+
+def _attach(shm, layout):
+    arrays = {}
+    offset = 0
+    for name, shape in layout.items():
+        arrays[name] = np.ndarray(shape, dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += int(np.prod(shape)) * 8
+    return arrays
+
+
+def _buffer_size(layout):
+    return sum(int(np.prod(shape)) * 8 for shape in layout.values())
+
+
+def _run_shard(task):
+    shm_name, n_shards, months, index, params, count, seed = task
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = _attach(shm, _buffer_layout(n_shards, months))
+        result = simulate_batch(params, count, rng=seed, months=months, keep_progress=False,
+                                progress_histogram=True)
+        out["counts"][index] = np.bincount(result["outcome"], minlength=len(OUTCOMES))
+        out["progress"][index] = result["histogram"]
+        out["duration"][index] = np.bincount(result["duration"], minlength=months + 1)
+    finally:
+        shm.close()
+
+
+def _shards(profiles, n, seed, shard_size):
+    # Un sous-flux par profil, puis un par tranche : indépendant du nombre de workers
+    per_profile = np.random.SeedSequence(seed).spawn(len(profiles))
+    tasks = []
+    n_chunks = -(-n // shard_size)
+    for k, params in enumerate(profiles):
+        for j, child in enumerate(per_profile[k].spawn(n_chunks)):
+            count = min(shard_size, n - j * shard_size)
+            tasks.append((k, params, count, child))
+    return tasks
+
+
+def simulate_parallel(params, n, seed=None, workers=None, shard_size=SHARD_SIZE, months=HORIZON):
+    # params : profil (8,) ou balayage de K profils (K, 8) ; n trajectoires par profil
+    if n < 1:
+        raise ValueError(f"il faut au moins une trajectoire : {n}")
+    if seed is None:
+        seed = new_seed()
+    params = np.asarray(params)
+    profiles = params.reshape(-1, params.shape[-1])
+    shards = _shards(profiles, n, seed, shard_size)
+    layout = _buffer_layout(len(shards), months)
+
+    shm = shared_memory.SharedMemory(create=True, size=_buffer_size(layout))
+    try:
+        tasks = [(shm.name, len(shards), months, i, p, count, child)
+                 for i, (_, p, count, child) in enumerate(shards)]
+        workers = workers or os.cpu_count()
+        if workers == 1:
+            for task in tasks:
+                _run_shard(task)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                list(pool.map(_run_shard, tasks))
+
+        # Fusion dans l'ordre des lots : sommes entières, donc exactes et déterministes
+        arrays = _attach(shm, layout)
+        owner = np.array([k for k, _, _, _ in shards])
+        merged = {}
+        for name, array in arrays.items():
+            total = np.zeros((len(profiles),) + array.shape[1:], dtype=np.int64)
+            np.add.at(total, owner, array)
+            merged[name] = total
+        del arrays
+    finally:
+        shm.close()
+        shm.unlink()
+
+    counts = [dict(zip(OUTCOMES, (int(c) for c in row))) for row in merged["counts"]]
+    single = params.ndim == 1
+    return {
+        "seed": seed,
+        "n": n,
+        "counts": counts[0] if single else counts,
+        "values": progress_values(months),
+        "progress_histogram": merged["progress"][0] if single else merged["progress"],
+        "duration_histogram": merged["duration"][0] if single else merged["duration"],
+    }
@@ -0,0 +1,163 @@
+# Population en interaction : les agents sont les nœuds d'un graphe social creux (CSR) et la
+# décision de chacun dépend de celle de ses voisins. Chaque mois, la part de voisins ayant
+# réussi augmente la pression extérieure effective, la part de voisins en échec renforce
+# l'invisibilisation ; la cascade habituelle de simulate() s'applique ensuite à tous les agents
+# encore indécis, en un seul passage vectorisé.
+#
+# Les produits matrice-vecteur creux sont écrits en NumPy (pas de dépendance à scipy). Comme les
+# statuts de succès/échec sont absorbants, on ne propage que les agents absorbés dans le mois :
+# le coût total de l'influence est O(nombre d'arêtes) sur tout l'horizon, au lieu d'un produit
+# complet par mois.
+
+import numpy as np
+
+from .batch import ECHEC, INDEFINI, N_DRAWS, SEUIL_ECHEC, SEUIL_SUCCES, SUCCES, event_probabilities, outcome_counts
+from .rng import make_rng
+
+POPULATION_HORIZON = 120
+DEFAULT_DEGREE = 10
+
+# Décalage maximal (en crans de curseur) quand tous les voisins ont réussi / échoué
+PRESSURE_GAIN = 3.0
+INVISIBILISATION_GAIN = 3.0
+
+
+class Graph:
+    # Matrice d'adjacence CSR : les voisins de l'agent i sont indices[indptr[i]:indptr[i + 1]]
+    def __init__(self, indptr, indices, weights=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self.n = len(self.indptr) - 1
+
+    @classmethod
+    def from_edges(cls, n, sources, targets, weights=None):
+        # Arêtes orientées source -> cible : la cible fait partie des voisins de la source
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+        weights = None if weights is None else np.asarray(weights)[order]
+        return cls(indptr, np.asarray(targets, dtype=np.int64)[order], weights)
+
+    def rows(self):
+        # Numéro de ligne de chaque arête
+        return np.repeat(np.arange(self.n), np.diff(self.indptr))
+
+    def transpose(self):
+        return Graph.from_edges(self.n, self.indices, self.rows(), self.weights)
+
+    def degree(self):
+        if self.weights is None:
+            return np.diff(self.indptr).astype(np.float64)
+        return np.bincount(self.rows(), weights=self.weights, minlength=self.n)
+
+    def matvec(self, x):
+        # y = A @ x
+        values = x[self.indices] if self.weights is None else x[self.indices] * self.weights
+        return np.bincount(self.rows(), weights=values, minlength=self.n)
+
+    def scatter(self, nodes):
+        # A.T @ e_nodes pour un vecteur indicateur creux, sur le graphe transposé :
+        # renvoie (lignes touchées, poids) sans parcourir les autres lignes
+        starts = self.indptr[nodes]
+        lengths = self.indptr[nodes + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        weights = None if self.weights is None else self.weights[positions]
+        return self.indices[positions], weights
+
+
+def small_world_graph(n, degree=DEFAULT_DEGREE, rewire=0.1, rng=None):
+    # Anneau de Watts-Strogatz : chaque agent cite ses `degree` plus proches voisins, chaque lien
+    # étant redirigé au hasard avec la probabilité `rewire` (rewire=1 : graphe aléatoire)
+    rng = make_rng(rng)
+    half = degree // 2
+    offsets = np.concatenate([np.arange(1, half + 1), -np.arange(1, degree - half + 1)])
+    targets = (np.arange(n)[:, None] + offsets[None, :]) % n
+    rewired = rng.random(targets.shape) < rewire
+    # Nouvelle cible distincte de l'agent lui-même
+    targets[rewired] = (np.nonzero(rewired)[0] + rng.integers(1, n, size=int(rewired.sum()))) % n
+    indptr = np.arange(0, n * degree + 1, degree, dtype=np.int64)
+    return Graph(indptr, targets.ravel())
+
+
+def simulate_population(params, graph, months=POPULATION_HORIZON, rng=None,
+                        pressure_gain=PRESSURE_GAIN, invisibilisation_gain=INVISIBILISATION_GAIN):
+    # params : profil unique (8,) ou un profil par agent (n, 8)
+    rng = make_rng(rng)
+    n = graph.n
+    params = np.broadcast_to(np.asarray(params, dtype=np.float64), (n, 8))
+    base = event_probabilities(params).astype(np.float32).T.copy()
+    pressure = params[:, 5]
+    invisibilisation = params[:, 6]
+
+    degree = graph.degree()
+    inverse_degree = np.divide(1.0, degree, out=np.zeros(n), where=degree > 0)
+    # Influence reçue : on diffuse l'issue d'un agent vers ceux qui le citent
+    incoming = graph.transpose()
+    succeeded_neighbours = np.zeros(n)
+    failed_neighbours = np.zeros(n)
+
+    progress = np.zeros(n, dtype=np.int16)
+    outcome = np.full(n, INDEFINI, dtype=np.uint8)
+    duration = np.full(n, months, dtype=np.int32)
+    # Agents encore indécis : la cascade ne tourne que sur eux
+    active = np.arange(n)
+
+    curves = {name: np.empty(months) for name in ("succès", "échec", "report indéfini",
+                                                  "pression_moyenne", "invisibilisation_moyenne")}
+    successes = failures = 0
+
+    for month in range(months):
+        # Paramètres effectifs sous influence des voisins, au début du mois
+        effective_pressure = np.minimum(
+            pressure[active] + pressure_gain * succeeded_neighbours[active] * inverse_degree[active], 10)
+        effective_invisibilisation = np.minimum(
+            invisibilisation[active] + invisibilisation_gain * failed_neighbours[active] * inverse_degree[active], 10)
+
+        p = base[:, active]
+        p[3] = effective_invisibilisation / 15
+        p[4] = np.where(effective_invisibilisation > 8, 0.5, 0.0)
+        p[5] = effective_pressure / 10
+
+        u = rng.random((N_DRAWS, len(active)), dtype=np.float32)
+        rest = (u[0] >= p[0]) & (u[1] >= p[1]) & (u[2] >= p[2])
+        invisible = rest & (u[3] < p[3])
+        act = rest & ~invisible & (u[4] >= p[4])
+        step = (u[5] < p[5]).astype(np.int16) * 2 + 1 - (u[6] < p[6])
+        step = step * act - invisible
+        current = progress[active] + step
+        progress[active] = current
+
+        # Résultat vérifié après une action, comme dans simulate()
+        success = act & (current >= SEUIL_SUCCES)
+        failure = act & (current <= SEUIL_ECHEC)
+        new_successes = active[success]
+        new_failures = active[failure]
+        outcome[new_successes] = SUCCES
+        outcome[new_failures] = ECHEC
+        duration[new_successes] = month + 1
+        duration[new_failures] = month + 1
+        successes += len(new_successes)
+        failures += len(new_failures)
+
+        curves["succès"][month] = successes / n
+        curves["échec"][month] = failures / n
+        curves["report indéfini"][month] = 1 - (successes + failures) / n
+        curves["pression_moyenne"][month] = effective_pressure.mean() if len(active) else np.nan
+        curves["invisibilisation_moyenne"][month] = effective_invisibilisation.mean() if len(active) else np.nan
+
+        # Propagation creuse : seuls les agents absorbés ce mois-ci modifient l'influence
+        for nodes, counts in ((new_successes, succeeded_neighbours), (new_failures, failed_neighbours)):
+            if len(nodes):
+                targets, weights = incoming.scatter(nodes)
+                np.add.at(counts, targets, 1.0 if weights is None else weights)
+
+        active = active[~(success | failure)]
+
+    return {
+        "counts": outcome_counts(outcome),
+        "outcome": outcome,
+        "duration": duration,
+        "curves": curves,
+    }
@@ -0,0 +1,77 @@
+# Monte-Carlo progressif : des paquets de trajectoires de taille croissante, avec intervalles de
+# Wilson sur chaque probabilité d'issue, jusqu'à ce que tous soient plus étroits que la largeur
+# visée. Chaque paquet produit un instantané (fréquences, intervalles, histogramme) que l'appelant
+# peut afficher pendant le calcul : réponse rapide, calcul borné par clic.
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from .batch import HORIZON, OUTCOMES, progress_values, simulate_batch
+from .fan import histogram_quantiles
+from .rng import make_rng
+
+FIRST_BATCH = 10_000
+MAX_TRAJECTORIES = 20_000_000
+
+
+def wilson_interval(successes, n, confidence=0.95):
+    # Intervalle de score de Wilson ; reste dans [0, 1] et se comporte bien près de 0 et 1
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    successes = np.asarray(successes, dtype=np.float64)
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return centre - half, centre + half
+
+
+def required_trajectories(p, width, confidence=0.95):
+    # Taille d'échantillon pour un intervalle de largeur `width` (approximation normale)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    return math.ceil((2 * z / width) ** 2 * max(p * (1 - p), 1e-6))
+
+
+def progressive_monte_carlo(params, width=0.01, confidence=0.95, rng=None, months=HORIZON,
+                            first=FIRST_BATCH, max_n=MAX_TRAJECTORIES):
+    # Générateur d'instantanés ; le dernier a "done" à True (précision atteinte ou plafond max_n)
+    rng = make_rng(rng)
+    counts = np.zeros(len(OUTCOMES), dtype=np.int64)
+    # Histogrammes mensuels de la progression (months, valeurs) : la dernière ligne donne la
+    # progression finale, l'ensemble donne l'éventail des quantiles
+    values = progress_values(months)
+    histogram = np.zeros((months, len(values)), dtype=np.int64)
+    n = 0
+    size = first
+    while True:
+        result = simulate_batch(params, size, rng=rng, months=months, keep_progress=False, progress_histogram=True)
+        counts += np.bincount(result["outcome"], minlength=len(OUTCOMES))
+        histogram += result["histogram"]
+        n += size
+
+        low, high = wilson_interval(counts, n, confidence)
+        widths = high - low
+        done = bool((widths < width).all()) or n >= max_n
+        yield {
+            "n": n,
+            "counts": dict(zip(OUTCOMES, counts.tolist())),
+            "frequencies": dict(zip(OUTCOMES, (counts / n).tolist())),
+            "intervals": dict(zip(OUTCOMES, zip(low.tolist(), high.tolist()))),
+            "width": float(widths.max()),
+            "histogram": {"values": values, "counts": histogram[-1].copy()},
+            "fan": histogram_quantiles(histogram, values),
+            "done": done,
+        }
+        if done:
+            return
+        # Taille visée d'après la fréquence la plus incertaine, sans plus que doubler l'échantillon
+        needed = max(required_trajectories(p, width, confidence) for p in counts / n)
+        size = int(min(max(needed - n, first), n, max_n - n))
+
+
+def run_until_precise(params, width=0.01, confidence=0.95, rng=None, months=HORIZON):
+    # Version non interactive : seul le dernier instantané
+    for snapshot in progressive_monte_carlo(params, width, confidence, rng, months):
+        pass
+    return snapshot
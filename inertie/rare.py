@@ -0,0 +1,124 @@
+# Événements rares par échantillonnage préférentiel. Pour un profil « sûr », P(échec) peut valoir
+# 1e-8 : il faudrait des milliards de trajectoires simulate() pour l'estimer. On simule plutôt sous
+# des probabilités mensuelles inclinées vers l'issue visée (pour l'échec : moins d'arrêts, plus
+# d'invisibilisation et de doute post-action, moins de pression), puis chaque trajectoire est
+# repondérée par son rapport de vraisemblance (voir simulate_batch(sampling=...)).
+#
+# L'inclinaison est réglée par entropie croisée : sur quelques paquets pilotes, on retient les
+# trajectoires qui vont le plus loin vers l'issue (niveaux intermédiaires tant qu'elle reste trop
+# rare), et chaque probabilité inclinée devient la fréquence pondérée du tirage parmi elles.
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from .batch import (
+    ECHEC,
+    HORIZON,
+    N_DRAWS,
+    SUCCES,
+    event_probabilities,
+    simulate_batch,
+)
+from .rng import make_rng
+
+# Tirages de la cascade, dans l'ordre de event_probabilities
+DRAW_NAMES = (
+    "pessimisme",
+    "procrastination",
+    "rareté",
+    "invisibilisation",
+    "auto-effacement",
+    "pression",
+    "aversion à la perte",
+)
+
+PILOT = 10_000
+ROUNDS = 30
+ELITE = 0.1
+SMOOTHING = 0.7
+# Bornes des probabilités inclinées : ni tirage impossible, ni tirage certain
+Q_MIN = 1e-3
+Q_MAX = 0.99
+
+
+def _level(result, outcome):
+    # Distance parcourue vers l'issue : progression la plus basse (échec) ou la plus haute (succès),
+    # et trajectoires encore candidates (non absorbées par l'autre issue)
+    if outcome == "échec":
+        return -result["progress"].min(axis=1).astype(np.float64), result["outcome"] != SUCCES
+    return result["progress"].max(axis=1).astype(np.float64), result["outcome"] != ECHEC
+
+
+def cross_entropy_tilt(params, outcome="échec", rng=None, months=HORIZON, draws=None, pilot=PILOT,
+                       rounds=ROUNDS, elite=ELITE, smoothing=SMOOTHING):
+    # Probabilités d'échantillonnage (7,) des tirages, ajustées sur des paquets pilotes
+    rng = make_rng(rng)
+    code = ECHEC if outcome == "échec" else SUCCES
+    # Par défaut, tous les tirages : l'entropie croisée laisse en place ceux qui n'aident pas
+    draws = list(range(N_DRAWS) if draws is None else draws)
+    p = event_probabilities(params).astype(np.float64)
+    # Un tirage impossible ou certain pour le profil le reste : l'incliner ne produirait que des poids nuls
+    draws = [draw for draw in draws if 0 < p[draw] < 1]
+    q = p.copy()
+    for _ in range(rounds):
+        result = simulate_batch(params, pilot, rng=rng, months=months, sampling=q)
+        reached = result["outcome"] == code
+        # Assez de trajectoires atteignent l'issue : dernière mise à jour sur elles seules. Sinon,
+        # niveau intermédiaire : les trajectoires qui vont le plus loin vers l'issue
+        final = reached.sum() >= elite * pilot
+        if final:
+            selected = reached
+        else:
+            # Les niveaux sont entiers : ex æquo départagés au hasard pour garder une élite étroite.
+            # Élite prise parmi les candidates, ou parmi toutes si l'autre issue a tout absorbé
+            level, candidates = _level(result, outcome)
+            level += rng.random(pilot) * 0.5
+            if not candidates.any():
+                candidates[:] = True
+            selected = reached | (candidates & (level >= np.quantile(level[candidates], 1 - elite)))
+        # Poids relatifs : seul leur rapport compte, on les recentre pour éviter un dépassement inférieur
+        log_weight = np.where(selected, result["log_weight"], -np.inf)
+        weights = np.exp(log_weight - log_weight.max())
+        uses = (result["draw_uses"][draws] * weights).sum(axis=1)
+        hits = (result["draw_hits"][draws] * weights).sum(axis=1)
+        updated = np.where(uses > 0, hits / np.where(uses > 0, uses, 1), q[draws])
+        q[draws] = np.clip(smoothing * updated + (1 - smoothing) * q[draws], Q_MIN, Q_MAX)
+        if final:
+            break
+    return q
+
+
+def rare_event_probability(params, outcome="échec", n=100_000, rng=None, months=HORIZON, draws=None,
+                           pilot=PILOT, confidence=0.95, tilt=None):
+    # Estimation pondérée de P(issue), avec erreur type et erreur relative ; tilt : probabilités
+    # d'échantillonnage imposées (sinon réglées par entropie croisée sur des paquets pilotes)
+    if outcome not in ("échec", "succès"):
+        raise ValueError(f"issue rare inconnue : {outcome} (échec ou succès)")
+    rng = make_rng(rng)
+    if tilt is None:
+        tilt = cross_entropy_tilt(params, outcome, rng=rng, months=months, draws=draws, pilot=pilot)
+    code = ECHEC if outcome == "échec" else SUCCES
+    result = simulate_batch(params, n, rng=rng, months=months, keep_progress=False, sampling=tilt)
+    reached = result["outcome"] == code
+    weights = np.exp(result["log_weight"]) * reached
+
+    estimate = float(weights.mean())
+    se = float(weights.std(ddof=1) / math.sqrt(n))
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    # Taille effective de l'échantillon pondéré (Kish) parmi les trajectoires qui atteignent l'issue
+    effective = float(weights.sum() ** 2 / (weights ** 2).sum()) if reached.any() else 0.0
+    return {
+        "outcome": outcome,
+        "estimate": estimate,
+        "se": se,
+        "relative_error": se / estimate if estimate > 0 else math.inf,
+        "ci": (max(estimate - z * se, 0.0), estimate + z * se),
+        "n": n,
+        "hits": int(reached.sum()),
+        "effective_sample_size": effective,
+        # Trajectoires naïves qu'il faudrait pour la même erreur type
+        "naive_equivalent": estimate * (1 - estimate) / se ** 2 if se > 0 else math.inf,
+        "tilt": {DRAW_NAMES[i]: float(tilt[i]) for i in range(len(DRAW_NAMES))},
+    }
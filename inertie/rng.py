@@ -0,0 +1,25 @@
+# Flux aléatoires explicites : chaque simulation reçoit sa graine ou son Generator,
+# au lieu de puiser dans le module random global partagé par tous les threads Streamlit.
+
+import numpy as np
+
+
+def new_seed():
+    # Graine courte (32 bits), lisible et réutilisable pour rejouer une trajectoire
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+
+def make_rng(seed=None):
+    # Accepte None, un entier, une SeedSequence ou un Generator déjà construit
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def spawn_seeds(seed, n):
+    # Sous-flux indépendants et déterministes, transmissibles à d'autres processus
+    return np.random.SeedSequence(seed).spawn(n)
+
+
+def spawn_rngs(seed, n):
+    return [np.random.default_rng(child) for child in spawn_seeds(seed, n)]
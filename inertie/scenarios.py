@@ -0,0 +1,61 @@
+# Comparaison de K profils (profil actuel et scénarios d'intervention) en un seul appel : le calcul
+# exact vectorisé donne pour les K profils à la fois les probabilités des issues et la distribution
+# de la progression, d'où les éventails, en quelques millisecondes.
+#
+# Sur demande (n trajectoires par profil), une simulation vient en plus : chaque ligne porte ses
+# propres paramètres, les issues sont ensuite comptées par profil. Les K profils partagent les
+# mêmes tirages (nombres aléatoires communs, voir inertie.variance) : les écarts entre scénarios ne
+# sont pas noyés dans le bruit.
+
+import numpy as np
+
+from .batch import HORIZON, N_DRAWS, OUTCOMES, simulate_batch
+from .fan import BATCH_SIZE, QUANTILES, histogram_quantiles
+from .markov import exact_distribution
+from .rng import make_rng
+from .scoring import inertia_scores
+
+
+class _SharedDraws:
+    # Tirages (months, N_DRAWS, k × m) produits mois par mois : un tirage (N_DRAWS, m) répété
+    # pour chacun des k profils
+    def __init__(self, rng, k, m):
+        self.rng = rng
+        self.k = k
+        self.m = m
+
+    def __getitem__(self, month):
+        return np.tile(self.rng.random((N_DRAWS, self.m), dtype=np.float32), self.k)
+
+
+def compare_scenarios(profiles, n=None, rng=None, months=HORIZON, quantiles=QUANTILES, batch_size=BATCH_SIZE):
+    # profiles : (K, 8) ; n : trajectoires simulées par profil, par paquets d'au plus batch_size
+    # lignes (None : calcul exact seulement)
+    profiles = np.atleast_2d(np.asarray(profiles, dtype=np.int64))
+    exact = exact_distribution(profiles, months=months)
+    result = {
+        "n": n,
+        "profiles": profiles,
+        "probabilities": np.stack([exact["probabilities"][name] for name in OUTCOMES], axis=-1),
+        "scores": inertia_scores(profiles),
+        "fan": histogram_quantiles(exact["progress"], exact["values"], quantiles),
+    }
+    if n:
+        result["counts"] = _shared_counts(profiles, n, make_rng(rng), months, batch_size)
+        result["frequencies"] = result["counts"] / n
+    return result
+
+
+def _shared_counts(profiles, n, rng, months, batch_size):
+    # Issues (K, 3) de n trajectoires par profil, sur des tirages communs aux K profils
+    k = len(profiles)
+    counts = np.zeros((k, len(OUTCOMES)), dtype=np.int64)
+    done = 0
+    while done < n:
+        m = min(max(batch_size // k, 1), n - done)
+        groups = np.repeat(np.arange(k), m)
+        result = simulate_batch(np.repeat(profiles, m, axis=0), k * m, months=months, keep_progress=False,
+                                uniforms=_SharedDraws(rng, k, m))
+        counts += np.bincount(groups * len(OUTCOMES) + result["outcome"], minlength=k * len(OUTCOMES)).reshape(k, -1)
+        done += m
+    return counts
@@ -0,0 +1,114 @@
+# Score d'inertie vectorisé et notation en flux de gros fichiers de profils (CSV ou JSONL).
+# Mêmes formules que DecisionAgent.calculate_inertia_score, appliquées colonne par colonne
+# sur des blocs de taille fixe : la mémoire reste constante quelle que soit la taille du fichier.
+
+import os
+import time
+
+import numpy as np
+
+from .batch import PARAM_NAMES
+
+# Bornes des postures de get_posture_and_advice : < 120, < 180, < 240, ≥ 240
+POSTURE_THRESHOLDS = np.array([120, 180, 240])
+
+SCORE_COLUMNS = (
+    "cognitif", "conjoncturel", "structurel", "total_brut", "total", "amplificateur_visibilite", "posture",
+)
+
+# Taille des blocs lus par les lecteurs Arrow (CSV et JSONL), en octets
+BLOCK_BYTES = 32 << 20
+
+
+def inertia_scores(params):
+    # params : (..., 8) dans l'ordre de PARAM_NAMES
+    params = np.asarray(params, dtype=np.float64)
+    (procrastination, pessimism, loss_aversion, scarcity,
+     avoidance, pressure, invisibilisation, visibilite_coulisses) = np.moveaxis(params, -1, 0)
+    score_cognitif = (procrastination + pessimism + loss_aversion + avoidance) * 2.5
+    score_conjoncturel = (scarcity + (10 - pressure)) * 5
+    score_structurel = invisibilisation * 10
+    amplificateur_visibilite = 1 + (10 - visibilite_coulisses) * 0.05
+    total_brut = score_cognitif + score_conjoncturel + score_structurel
+    total = total_brut * amplificateur_visibilite
+    return {
+        "cognitif": score_cognitif,
+        "conjoncturel": score_conjoncturel,
+        "structurel": score_structurel,
+        "total_brut": total_brut,
+        "total": total,
+        "amplificateur_visibilite": amplificateur_visibilite,
+    }
+
+
+def posture_bucket(total):
+    # 0 à 3, dans l'ordre des postures de get_posture_and_advice
+    return np.searchsorted(POSTURE_THRESHOLDS, total, side="right")
+
+
+def _score_columns(columns):
+    # columns : accès colonne par nom de paramètre -> tableau NumPy ; renvoie les colonnes ajoutées
+    scores = inertia_scores(np.column_stack([np.asarray(columns(name)) for name in PARAM_NAMES]))
+    scores["posture"] = posture_bucket(scores["total"])
+    return scores
+
+
+def _file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    return "jsonl" if extension in (".jsonl", ".ndjson") else "csv"
+
+
+def _scored_batch(block):
+    # Bloc Arrow lu -> bloc Arrow avec les colonnes de scores ajoutées
+    import pyarrow as pa
+
+    scores = _score_columns(lambda name: block.column(name).to_numpy())
+    return pa.RecordBatch.from_arrays(
+        block.columns + [pa.array(scores[name]) for name in SCORE_COLUMNS],
+        names=block.schema.names + list(SCORE_COLUMNS),
+    )
+
+
+def _score_csv(source, destination, block_size):
+    # CSV : lecteur et écrivain Arrow en flux, bloc par bloc
+    import pyarrow.csv as pacsv
+
+    rows = 0
+    reader = pacsv.open_csv(source, read_options=pacsv.ReadOptions(block_size=block_size))
+    writer = None
+    try:
+        for block in reader:
+            out = _scored_batch(block)
+            if writer is None:
+                writer = pacsv.CSVWriter(destination, out.schema)
+            writer.write_batch(out)
+            rows += block.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _score_jsonl(source, destination, block_size):
+    # JSONL : lecteur Arrow en flux comme pour le CSV ; Arrow n'écrit pas le JSON, chaque bloc
+    # noté est sérialisé par pandas
+    import pyarrow.json as pajson
+
+    rows = 0
+    reader = pajson.open_json(source, read_options=pajson.ReadOptions(block_size=block_size))
+    with open(destination, "w", encoding="utf-8") as out:
+        for block in reader:
+            _scored_batch(block).to_pandas().to_json(out, orient="records", lines=True, force_ascii=False)
+            rows += block.num_rows
+    return rows
+
+
+def score_file(source, destination, block_size=BLOCK_BYTES):
+    # Le format (CSV ou JSONL) suit l'extension ; la sortie reprend les colonnes d'entrée et ajoute les scores
+    start = time.perf_counter()
+    if _file_format(source) == "jsonl":
+        rows = _score_jsonl(source, destination, block_size)
+    else:
+        rows = _score_csv(source, destination, block_size)
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds else None}
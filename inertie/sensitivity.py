@@ -0,0 +1,83 @@
+# Analyse de sensibilité globale (indices de Sobol, schéma de Saltelli) des huit curseurs.
+# Chaque curseur est tiré uniformément sur ses valeurs entières 0-10 ; les sorties sont calculées
+# en un seul appel vectorisé (probabilités exactes + score d'inertie) sur les N·(d+2) profils.
+
+import numpy as np
+
+from .batch import PARAM_NAMES
+from .markov import exact_distribution
+from .rng import make_rng
+from .scoring import inertia_scores
+
+OUTPUTS = ("succès", "échec", "inertie")
+
+
+def evaluate(profiles):
+    # Sorties étudiées pour un lot de profils (..., 8)
+    probabilities = exact_distribution(profiles, keep_progress=False)["probabilities"]
+    return {
+        "succès": probabilities["succès"],
+        "échec": probabilities["échec"],
+        "inertie": inertia_scores(profiles)["total"],
+    }
+
+
+def saltelli_profiles(n, rng=None):
+    # Matrices A, B (n, d) et AB (d, n, d) : AB[i] = A avec la colonne i prise dans B
+    rng = make_rng(rng)
+    d = len(PARAM_NAMES)
+    a = rng.integers(0, 11, size=(n, d))
+    b = rng.integers(0, 11, size=(n, d))
+    ab = np.repeat(a[None], d, axis=0)
+    for i in range(d):
+        ab[i, :, i] = b[:, i]
+    return a, b, ab
+
+
+def sobol_indices(f_a, f_b, f_ab):
+    # Premier ordre (Saltelli 2010) et total (Jansen) ; f_ab : (d, n)
+    variance = np.var(np.concatenate([f_a, f_b]))
+    if variance == 0:
+        zeros = np.zeros(len(f_ab))
+        return zeros, zeros
+    first = np.mean(f_b * (f_ab - f_a), axis=-1) / variance
+    total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=-1) / variance
+    return first, total
+
+
+def sensitivity_analysis(n=4096, rng=None, n_bootstrap=200, confidence=0.95):
+    rng = make_rng(rng)
+    d = len(PARAM_NAMES)
+    a, b, ab = saltelli_profiles(n, rng)
+    outputs = evaluate(np.concatenate([a, b, ab.reshape(-1, d)]))
+
+    report = {"n": n, "evaluations": n * (d + 2), "outputs": {}}
+    low, high = (1 - confidence) / 2, (1 + confidence) / 2
+    for name in OUTPUTS:
+        values = outputs[name]
+        f_a, f_b, f_ab = values[:n], values[n:2 * n], values[2 * n:].reshape(d, n)
+        first, total = sobol_indices(f_a, f_b, f_ab)
+
+        # Bootstrap sur les lignes : intervalles de confiance des indices
+        boot_first = np.empty((n_bootstrap, d))
+        boot_total = np.empty((n_bootstrap, d))
+        for k in range(n_bootstrap):
+            rows = rng.integers(0, n, size=n)
+            boot_first[k], boot_total[k] = sobol_indices(f_a[rows], f_b[rows], f_ab[:, rows])
+
+        # Convergence : indices recalculés sur des sous-échantillons croissants
+        sizes = [size for size in (n // 8, n // 4, n // 2, n) if size > 1]
+        convergence = {
+            size: dict(zip(("S1", "ST"), (dict(zip(PARAM_NAMES, idx.tolist())) for idx in
+                                          sobol_indices(f_a[:size], f_b[:size], f_ab[:, :size]))))
+            for size in sizes
+        }
+
+        report["outputs"][name] = {
+            "S1": dict(zip(PARAM_NAMES, first.tolist())),
+            "ST": dict(zip(PARAM_NAMES, total.tolist())),
+            "S1_ci": dict(zip(PARAM_NAMES, np.quantile(boot_first, [low, high], axis=0).T.tolist())),
+            "ST_ci": dict(zip(PARAM_NAMES, np.quantile(boot_total, [low, high], axis=0).T.tolist())),
+            "convergence": convergence,
+        }
+    return report
@@ -0,0 +1,139 @@
+# État par session borné. st.session_state ne garde qu'un descripteur compact du lancement
+# (profil, graine) ; les résultats lourds (trajectoire, agrégats, éventail...) sont épinglés ici,
+# dans un registre du processus, sous un budget mémoire par session et un budget global. Les
+# résultats d'un lancement précédent partent en premier (LRU), les sessions inactives perdent
+# toutes leurs épingles ; à leur retour, les résultats sont relus dans le cache partagé ou le
+# registre persistant, ou recalculés (tous sont déterministes : profil + graine).
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from . import metrics
+
+SESSION_BUDGET = int(os.environ.get("INERTIE_SESSION_BYTES", 256 << 10))
+GLOBAL_BUDGET = int(os.environ.get("INERTIE_SESSIONS_BYTES", 64 << 20))
+IDLE_SECONDS = float(os.environ.get("INERTIE_SESSION_IDLE", 600))
+# Balayage des sessions inactives au plus une fois par intervalle
+SWEEP_SECONDS = 30.0
+
+SESSION_KEY = "session_id"
+
+
+def payload_size(value):
+    # Estimation en octets : tableaux NumPy au plus juste, conteneurs parcourus récursivement
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(payload_size(k) + payload_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return sys.getsizeof(value)
+
+
+class SessionManager:
+    def __init__(self, session_budget=SESSION_BUDGET, global_budget=GLOBAL_BUDGET, idle_seconds=IDLE_SECONDS):
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self.idle_seconds = idle_seconds
+        # id de session -> {"seen": instant, "pins": OrderedDict(clé -> (valeur, octets)), "bytes": total}
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def session_id(self, state):
+        if SESSION_KEY not in state:
+            state[SESSION_KEY] = uuid.uuid4().hex
+        return state[SESSION_KEY]
+
+    def _session(self, sid, now):
+        session = self._sessions.get(sid)
+        if session is None:
+            session = self._sessions[sid] = {"seen": now, "pins": OrderedDict(), "bytes": 0}
+        session["seen"] = now
+        self._sessions.move_to_end(sid)
+        return session
+
+    def result(self, state, key, compute):
+        # Résultat épinglé pour la session, sinon calculé (ou relu) puis épinglé
+        sid = self.session_id(state)
+        now = time.monotonic()
+        with self._lock:
+            session = self._session(sid, now)
+            pinned = session["pins"].get(key)
+            if pinned is not None:
+                session["pins"].move_to_end(key)
+                self.hits += 1
+                return pinned[0]
+            self.reloads += 1
+        value = compute()
+        self._pin(sid, key, value, now)
+        return value
+
+    def _drop(self, session, key):
+        _, size = session["pins"].pop(key)
+        session["bytes"] -= size
+        self._bytes -= size
+        self.evictions += 1
+
+    def _pin(self, sid, key, value, now):
+        size = payload_size(value)
+        if size > self.session_budget:
+            return
+        with self._lock:
+            session = self._session(sid, now)
+            if key in session["pins"]:
+                return
+            session["pins"][key] = (value, size)
+            session["bytes"] += size
+            self._bytes += size
+            # Budget de la session : ses résultats les moins récemment lus partent d'abord
+            while session["bytes"] > self.session_budget:
+                self._drop(session, next(iter(session["pins"])))
+            if now - self._last_sweep >= SWEEP_SECONDS:
+                self._sweep(now)
+            # Budget global : sessions les moins récemment actives d'abord
+            for other in list(self._sessions):
+                if self._bytes <= self.global_budget:
+                    break
+                if other == sid:
+                    continue
+                victim = self._sessions[other]
+                while victim["pins"] and self._bytes > self.global_budget:
+                    self._drop(victim, next(iter(victim["pins"])))
+        metrics.set_gauge("session_pinned_bytes", self._bytes)
+
+    def _sweep(self, now):
+        # Sessions inactives : épingles libérées, entrée supprimée
+        self._last_sweep = now
+        for sid in [sid for sid, session in self._sessions.items() if now - session["seen"] > self.idle_seconds]:
+            session = self._sessions.pop(sid)
+            for key in list(session["pins"]):
+                self._drop(session, key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "session_budget": self.session_budget,
+                "global_budget": self.global_budget,
+                "hits": self.hits,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+            }
+
+
+# Instance unique par processus, partagée entre les sessions
+SESSIONS = SessionManager()
@@ -0,0 +1,248 @@
+# Registre persistant des simulations (SQLite, ajout seul) : profil, graine, version du moteur,
+# issue, trajectoire compacte, score d'inertie et agrégats batch, indexés par une empreinte du
+# profil. Sert les requêtes répétées (« toutes les trajectoires avec invisibilisation ≥ 8 ») et
+# réchauffe le cache de résultats au démarrage, au lieu de tout recalculer.
+#
+# Les écritures sont regroupées en insertions par paquets, vidées au plus tard FLUSH_SECONDS
+# après le premier enregistrement en attente (minuterie), même si plus rien n'arrive ; les
+# lectures voient aussi les enregistrements encore en attente d'écriture.
+
+import atexit
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .batch import ENGINE_VERSION, PARAM_NAMES
+from .scoring import inertia_scores
+
+# INERTIE_STORE vide : registre désactivé
+DEFAULT_PATH = os.environ.get(
+    "INERTIE_STORE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "runs.sqlite"),
+)
+
+# Écriture dès que le tampon atteint cette taille, ou que son plus vieil élément a cet âge
+FLUSH_SIZE = 256
+FLUSH_SECONDS = 2.0
+
+OPERATORS = ("<", "<=", "=", ">=", ">", "!=")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    param_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    seed INTEGER,
+    engine_version INTEGER NOT NULL,
+    {", ".join(f"{name} INTEGER NOT NULL" for name in PARAM_NAMES)},
+    outcome TEXT,
+    events BLOB,
+    progress BLOB,
+    inertia_total REAL,
+    payload TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_lookup ON runs (param_hash, kind, seed, engine_version);
+{"".join(f"CREATE INDEX IF NOT EXISTS runs_{name} ON runs ({name});" for name in PARAM_NAMES)}
+"""
+
+COLUMNS = ("param_hash", "kind", "seed", "engine_version") + PARAM_NAMES + (
+    "outcome", "events", "progress", "inertia_total", "payload", "created")
+
+
+def param_hash(params):
+    # Empreinte courte et stable d'un profil entier
+    return hashlib.blake2b(np.asarray(params, dtype=np.int64).tobytes(), digest_size=8).hexdigest()
+
+
+def _encode(value):
+    # JSON avec tableaux NumPy typés
+    if isinstance(value, np.ndarray):
+        return {"__array__": value.tolist(), "dtype": str(value.dtype)}
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if "__array__" in value:
+            return np.array(value["__array__"], dtype=value["dtype"])
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def _record(kind, params, seed, value):
+    params = tuple(int(p) for p in params)
+    row = {
+        "param_hash": param_hash(params),
+        "kind": kind,
+        "seed": seed,
+        "engine_version": ENGINE_VERSION,
+        "outcome": None,
+        "events": None,
+        "progress": None,
+        "inertia_total": float(inertia_scores(params)["total"]),
+        "payload": None,
+        "created": time.time(),
+    }
+    row.update(zip(PARAM_NAMES, params))
+    if kind == "trajectory":
+        # Trajectoire compacte : codes uint8 et progression en octets bruts
+        events, outcome, progress = value
+        row["outcome"] = outcome
+        row["events"] = np.asarray(events, dtype=np.uint8).tobytes()
+        row["progress"] = np.asarray(progress).tobytes()
+        row["payload"] = json.dumps({"progress_dtype": str(np.asarray(progress).dtype)})
+    else:
+        row["payload"] = json.dumps(_encode(value), ensure_ascii=False)
+    return tuple(row[column] for column in COLUMNS)
+
+
+def _value(kind, outcome, events, progress, payload):
+    payload = json.loads(payload) if payload is not None else None
+    if kind == "trajectory":
+        return (np.frombuffer(events, dtype=np.uint8).copy(), outcome,
+                np.frombuffer(progress, dtype=payload["progress_dtype"]).copy())
+    # Les tuples reviennent en listes
+    return _decode(payload)
+
+
+class RunStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        # WAL : lectures concurrentes pendant les écritures
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._pending = []
+        self._timer = None
+        self._closed = False
+
+    def put(self, kind, params, seed, value):
+        with self._lock:
+            self._pending.append(_record(kind, params, seed, value))
+            if len(self._pending) >= FLUSH_SIZE:
+                self.flush()
+            elif self._timer is None:
+                # Premier enregistrement en attente : écriture différée d'au plus FLUSH_SECONDS
+                self._timer = threading.Timer(FLUSH_SECONDS, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def put_many(self, records):
+        # records : itérable de (kind, params, seed, value), écrit en une transaction
+        rows = [_record(*record) for record in records]
+        with self._lock:
+            self._pending.extend(rows)
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending or self._closed:
+                return 0
+            placeholders = ", ".join("?" for _ in COLUMNS)
+            with self._connection:
+                self._connection.executemany(
+                    f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({placeholders})", self._pending)
+            written = len(self._pending)
+            self._pending = []
+            return written
+
+    def get(self, kind, params, seed=None, default=None):
+        # Dernier résultat enregistré pour (kind, profil, graine) avec la version courante du moteur ;
+        # default si aucun (un résultat enregistré peut lui-même valoir None)
+        key = param_hash(params)
+        with self._lock:
+            for row in reversed(self._pending):
+                if row[0] == key and row[1] == kind and row[2] == seed:
+                    return _value(kind, *self._row_fields(row))
+            found = self._connection.execute(
+                "SELECT outcome, events, progress, payload FROM runs "
+                "WHERE param_hash = ? AND kind = ? AND seed IS ? AND engine_version = ? "
+                "ORDER BY id DESC LIMIT 1",
+                (key, kind, seed, ENGINE_VERSION),
+            ).fetchone()
+        return default if found is None else _value(kind, *found)
+
+    @staticmethod
+    def _row_fields(row):
+        fields = dict(zip(COLUMNS, row))
+        return fields["outcome"], fields["events"], fields["progress"], fields["payload"]
+
+    def query(self, conditions=(), kind=None, limit=None, all_versions=False):
+        # conditions : [(curseur, opérateur, valeur)], ex. [("invisibilisation", ">=", 8)]
+        clauses = []
+        values = []
+        for name, operator, value in conditions:
+            if name not in PARAM_NAMES + ("inertia_total", "seed"):
+                raise ValueError(f"colonne inconnue : {name}")
+            if operator not in OPERATORS:
+                raise ValueError(f"opérateur inconnu : {operator}")
+            clauses.append(f"{name} {operator} ?")
+            values.append(value)
+        if kind is not None:
+            clauses.append("kind = ?")
+            values.append(kind)
+        if not all_versions:
+            clauses.append("engine_version = ?")
+            values.append(ENGINE_VERSION)
+        sql = "SELECT id, kind, seed, engine_version, {}, outcome, inertia_total, payload, created FROM runs".format(
+            ", ".join(PARAM_NAMES))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        self.flush()
+        with self._lock:
+            cursor = self._connection.execute(sql, values)
+            names = [description[0] for description in cursor.description]
+            rows = cursor.fetchall()
+        return [dict(zip(names, row)) for row in rows]
+
+    def recent(self, limit):
+        # Derniers résultats distincts (kind, profil, graine), du plus récent au plus ancien
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT kind, seed, {}, outcome, events, progress, payload FROM runs "
+                "WHERE id IN (SELECT MAX(id) FROM runs WHERE engine_version = ? "
+                "GROUP BY param_hash, kind, seed) ORDER BY id DESC LIMIT ?".format(", ".join(PARAM_NAMES)),
+                (ENGINE_VERSION, limit),
+            ).fetchall()
+        width = len(PARAM_NAMES)
+        for row in rows:
+            kind, seed, params = row[0], row[1], row[2:2 + width]
+            yield kind, params, seed, _value(kind, *row[2 + width:])
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._closed = True
+            self._connection.close()
+
+
+@functools.lru_cache(maxsize=None)
+def open_store(path=DEFAULT_PATH):
+    # Une connexion par processus, vidée à la sortie
+    store = RunStore(path)
+    atexit.register(store.close)
+    return store
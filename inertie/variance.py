@@ -0,0 +1,126 @@
+# Réduction de variance pour comparer deux profils (ex. pression 5 contre 6).
+# Le moteur vectorisé simulate_batch() consomme un nombre fixe de tirages uniformes par mois
+# (N_DRAWS), indépendamment du profil : on peut donc imposer les mêmes tirages aux deux profils et
+# choisir leur construction. (DecisionAgent.simulate() n'a pas cette propriété : il s'arrête au
+# premier tirage qui clôt le mois et saute l'auto-effacement si l'invisibilisation est ≤ 8.)
+#
+#   independent : flux distincts pour A et B (référence)
+#   crn         : nombres aléatoires communs, mêmes tirages pour A et B
+#   antithetic  : CRN + paires antithétiques (u, 1 - u)
+#   sobol       : CRN + suites de Sobol brouillées sur les months × N_DRAWS tirages (scipy requis),
+#                 variance estimée sur des réplications indépendantes
+#
+# Le rapport donne, pour chaque issue, la différence P(B) - P(A), son erreur type et le facteur de
+# réduction de variance par rapport à des tirages indépendants de même taille.
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from .batch import HORIZON, N_DRAWS, OUTCOMES, simulate_batch
+from .markov import exact_distribution, long_horizon_distribution
+from .rng import make_rng, spawn_seeds
+
+METHODS = ("independent", "crn", "antithetic", "sobol")
+CHUNK = 1 << 16
+SOBOL_REPLICATES = 16
+
+
+def _indicators(params, uniforms, months):
+    # Indicatrices (issues, n) des trajectoires simulées sur les tirages donnés
+    outcome = simulate_batch(params, uniforms.shape[-1], months=months, keep_progress=False,
+                             uniforms=uniforms)["outcome"]
+    return (outcome[None, :] == np.arange(len(OUTCOMES))[:, None]).astype(np.float64)
+
+
+def _pseudo_random(rng, n, months):
+    return rng.random((months, N_DRAWS, n), dtype=np.float32)
+
+
+def _sobol_engine(months, seed):
+    try:
+        from scipy.stats import qmc
+    except ImportError as error:
+        raise ImportError("la méthode « sobol » nécessite scipy (pip install scipy)") from error
+    return qmc.Sobol(d=months * N_DRAWS, scramble=True, seed=np.random.default_rng(seed))
+
+
+def _sobol_uniforms(engine, n, months):
+    # Dimension k = mois × N_DRAWS + tirage : les premiers mois prennent les meilleures coordonnées
+    points = engine.random(n)
+    return np.ascontiguousarray(points.T.reshape(months, N_DRAWS, n), dtype=np.float32)
+
+
+def _units(params_a, params_b, n, method, rng, months, replicates):
+    # Unités statistiques indépendantes de l'estimateur de P(B) - P(A), par paquets :
+    # trajectoires (independent, crn), paires (antithetic) ou réplications (sobol)
+    if method == "sobol":
+        # Suite de Sobol : puissance de 2 par réplication pour garder l'équilibre de la suite
+        per_replicate = 1 << max(int(math.ceil(math.log2(max(n // replicates, 2)))), 1)
+        for seed in spawn_seeds(rng.integers(2 ** 63), replicates):
+            engine = _sobol_engine(months, seed)
+            total = np.zeros(len(OUTCOMES))
+            for start in range(0, per_replicate, CHUNK):
+                u = _sobol_uniforms(engine, min(CHUNK, per_replicate - start), months)
+                total += (_indicators(params_b, u, months) - _indicators(params_a, u, months)).sum(axis=-1)
+            yield (total / per_replicate)[:, None], per_replicate
+        return
+
+    for start in range(0, n, CHUNK):
+        size = min(CHUNK, n - start)
+        if method == "antithetic":
+            half = _pseudo_random(rng, size // 2, months)
+            u = np.concatenate([half, 1 - half], axis=-1)
+            diff = _indicators(params_b, u, months) - _indicators(params_a, u, months)
+            yield (diff[:, :size // 2] + diff[:, size // 2:]) / 2, 2 * (size // 2)
+        elif method == "crn":
+            u = _pseudo_random(rng, size, months)
+            yield _indicators(params_b, u, months) - _indicators(params_a, u, months), size
+        else:
+            diff = _indicators(params_b, _pseudo_random(rng, size, months), months)
+            diff -= _indicators(params_a, _pseudo_random(rng, size, months), months)
+            yield diff, size
+
+
+def compare_profiles(params_a, params_b, n=100_000, method="crn", rng=None, months=HORIZON,
+                     replicates=SOBOL_REPLICATES, confidence=0.95):
+    # n : trajectoires par profil (arrondi au pair pour antithetic, aux puissances de 2 pour sobol)
+    if method not in METHODS:
+        raise ValueError(f"méthode inconnue : {method} (au choix : {', '.join(METHODS)})")
+    rng = make_rng(rng)
+    units = []
+    trajectories = 0
+    for chunk, size in _units(params_a, params_b, n, method, rng, months, replicates):
+        units.append(chunk)
+        trajectories += size
+    units = np.concatenate(units, axis=-1)
+    k = units.shape[-1]
+
+    mean = units.mean(axis=-1)
+    variance = units.var(axis=-1, ddof=1) / k
+    # Variance de référence : tirages indépendants de même taille, d'après les probabilités exactes
+    pa = _reference(params_a, months)
+    pb = _reference(params_b, months)
+    independent_variance = (pa * (1 - pa) + pb * (1 - pb)) / trajectories
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    report = {"method": method, "n": trajectories, "outcomes": {}}
+    for i, name in enumerate(OUTCOMES):
+        se = math.sqrt(variance[i])
+        report["outcomes"][name] = {
+            "difference": float(mean[i]),
+            "se": se,
+            "ci": (float(mean[i] - z * se), float(mean[i] + z * se)),
+            "variance_reduction": float(independent_variance[i] / variance[i]) if variance[i] > 0 else math.inf,
+        }
+    return report
+
+
+def _reference(params, months):
+    # Probabilités exactes d'un profil, sans bruit d'estimation
+    if months > HORIZON:
+        probabilities = long_horizon_distribution(params, months)
+    else:
+        probabilities = exact_distribution(params, months=months, keep_progress=False)["probabilities"]
+    return np.array([probabilities[name] for name in OUTCOMES])
@@ -0,0 +1,31 @@
+# Cache de résultats adossé au registre persistant : un résultat None enregistré est un succès
+# de lecture, pas un calcul à refaire.
+
+import sqlite3
+
+from inertie import cache
+from inertie.store import RunStore
+
+PROFILE = (1, 2, 3, 4, 5, 6, 7, 8)
+
+
+def test_stored_none_is_a_hit(tmp_path, monkeypatch):
+    path = str(tmp_path / "runs.sqlite")
+    store = RunStore(path)
+    monkeypatch.setattr(cache, "STORE", store)
+    calls = []
+    for _ in range(3):
+        cache.RESULTS.clear()
+        assert cache.cached("plan", PROFILE, lambda: calls.append(1), args=(0.5,)) is None
+    store.close()
+    assert len(calls) == 1
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM runs").fetchone() == (1,)
+
+
+def test_missing_run_returns_default(tmp_path):
+    store = RunStore(str(tmp_path / "runs.sqlite"))
+    marker = object()
+    assert store.get("plan:0.5", PROFILE, default=marker) is marker
+    store.put("plan:0.5", PROFILE, None, None)
+    assert store.get("plan:0.5", PROFILE, default=marker) is None
+    store.close()
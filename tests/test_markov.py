@@ -0,0 +1,41 @@
+# Le calcul exact, le mode batch et simulate() décrivent le même processus : les fréquences
+# simulées restent à quelques écarts-types des probabilités exactes.
+
+import numpy as np
+import pytest
+
+from inertie.agent import DecisionAgent
+from inertie.batch import OUTCOMES
+from inertie.markov import cross_check, exact_distribution, long_horizon_distribution, transition_kernel
+
+PROFILES = [
+    (5, 5, 5, 5, 5, 5, 5, 5),
+    (2, 1, 3, 2, 4, 9, 1, 8),
+    (9, 8, 7, 9, 6, 1, 9, 0),
+    (0, 0, 0, 0, 0, 10, 0, 10),
+]
+# Écart toléré, en écarts-types
+Z_MAX = 5
+
+
+@pytest.mark.parametrize("params", PROFILES)
+@pytest.mark.parametrize("batch", [False, True])
+def test_simulation_matches_exact(params, batch):
+    report = cross_check(DecisionAgent(*params), n=20_000 if batch else 5_000, rng=0, batch=batch)
+    for name in OUTCOMES:
+        assert abs(report[name]["z"]) < Z_MAX, (name, report[name])
+
+
+@pytest.mark.parametrize("params", PROFILES)
+def test_transition_kernel_rows_sum_to_one(params):
+    kernel = transition_kernel(params)
+    assert (kernel >= 0).all()
+    np.testing.assert_allclose(kernel.sum(axis=1), 1.0, atol=1e-12)
+
+
+@pytest.mark.parametrize("params", PROFILES)
+def test_long_horizon_matches_exact(params):
+    exact = exact_distribution(params)["probabilities"]
+    long = long_horizon_distribution(params, 12)
+    for name in OUTCOMES:
+        assert long[name] == pytest.approx(exact[name], abs=1e-12)
@@ -0,0 +1,89 @@
+# La recherche du plan minimal écarte les candidats dominés par un échec : elle n'est juste que si
+# P(succès) croît dans chaque sens favorable. Comparaison à une recherche exhaustive sur la boîte.
+
+import itertools
+
+import numpy as np
+import pytest
+
+from inertie import optimizer
+from inertie.batch import PARAM_NAMES
+from inertie.scoring import inertia_scores
+
+SEEDS = range(12)
+
+
+def _random_case(seed):
+    # Profil, poids (deux curseurs figés pour garder la boîte petite)
+    rng = np.random.default_rng(seed)
+    params = rng.integers(0, 11, len(PARAM_NAMES))
+    frozen = rng.choice(len(PARAM_NAMES), 2, replace=False)
+    weights = {name: None if axis in frozen else float(rng.choice([1, 2, 3]))
+               for axis, name in enumerate(PARAM_NAMES)}
+    return params, weights
+
+
+def _box(params, weights):
+    # Tous les profils atteignables par déplacements favorables, et leur coût
+    ranges = []
+    for axis, name in enumerate(PARAM_NAMES):
+        room = 10 - params[axis] if optimizer.DIRECTIONS[name] > 0 else params[axis]
+        ranges.append(range(room + 1) if weights[name] is not None else range(1))
+    deltas = np.array(list(itertools.product(*ranges)))
+    signs = np.array([optimizer.DIRECTIONS[name] for name in PARAM_NAMES])
+    costs = deltas @ np.array([weights[name] or 0.0 for name in PARAM_NAMES])
+    return params + deltas * signs, costs
+
+
+def _exhaustive(values, costs, ok, prefer):
+    # Coût minimal parmi les profils qui atteignent l'objectif, puis meilleure valeur à coût égal
+    if not ok.any():
+        return None
+    cost = costs[ok].min()
+    return cost, prefer(values[ok & (costs == cost)])
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("target", [0.3, 0.5, 0.7])
+def test_success_plan_matches_exhaustive_search(seed, target):
+    params, weights = _random_case(seed)
+    profiles, costs = _box(params, weights)
+    values = optimizer.success_probability(profiles)
+    expected = _exhaustive(values, costs, values >= target, np.max)
+    plan = optimizer.minimal_intervention(params, target_success=target, weights=weights)
+    if expected is None:
+        assert plan is None
+    else:
+        assert (plan["cost"], plan["value"]) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("max_score", [120, 180, 240])
+def test_score_plan_matches_exhaustive_search(seed, max_score):
+    params, weights = _random_case(seed)
+    profiles, costs = _box(params, weights)
+    values = inertia_scores(profiles)["total"]
+    expected = _exhaustive(values, costs, values < max_score, np.min)
+    plan = optimizer.minimal_intervention(params, max_score=max_score, weights=weights)
+    if expected is None:
+        assert plan is None
+    else:
+        assert (plan["cost"], plan["value"]) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_success_is_monotone_along_favourable_moves(seed):
+    rng = np.random.default_rng(seed)
+    profiles = rng.integers(0, 11, (2_000, len(PARAM_NAMES)))
+    base = optimizer.success_probability(profiles)
+    for axis, name in enumerate(PARAM_NAMES):
+        moved = profiles.copy()
+        moved[:, axis] = np.clip(moved[:, axis] + optimizer.DIRECTIONS[name], 0, 10)
+        assert (optimizer.success_probability(moved) >= base - 1e-12).all(), name
+
+
+def test_evaluation_budget_gives_no_plan():
+    params = (10, 10, 10, 10, 10, 0, 10, 0)
+    assert optimizer.minimal_intervention(params, target_success=0.5, max_evaluations=100) is None
+    plan = optimizer.minimal_intervention((5,) * 8, target_success=0.5)
+    assert plan is not None and plan["value"] >= 0.5
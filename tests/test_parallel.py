@@ -0,0 +1,26 @@
+# Même graine, même résultat, quel que soit le nombre de workers : les sous-flux aléatoires
+# suivent les tranches, pas les processus.
+
+import numpy as np
+import pytest
+
+from inertie.fan import fan_quantiles
+from inertie.parallel import simulate_parallel
+
+PROFILES = [(5, 5, 5, 5, 5, 5, 5, 5), (2, 1, 3, 2, 4, 9, 1, 8)]
+
+
+@pytest.mark.parametrize("params", [PROFILES[0], PROFILES])
+def test_result_does_not_depend_on_worker_count(params):
+    single = simulate_parallel(params, 5_000, seed=7, workers=1, shard_size=1_000)
+    pooled = simulate_parallel(params, 5_000, seed=7, workers=2, shard_size=1_000)
+    assert single["counts"] == pooled["counts"]
+    np.testing.assert_array_equal(single["progress_histogram"], pooled["progress_histogram"])
+    np.testing.assert_array_equal(single["duration_histogram"], pooled["duration_histogram"])
+
+
+def test_empty_runs_are_rejected():
+    with pytest.raises(ValueError):
+        simulate_parallel(PROFILES[0], 0, seed=7, workers=1)
+    with pytest.raises(ValueError):
+        fan_quantiles(PROFILES[0], 0, rng=0)